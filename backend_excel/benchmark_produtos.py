@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark do cruzamento produtos x preços do cache.
+Compara a busca linha a linha antiga (máscara sobre B_Precos para cada produto)
+com o merge por código usado em ExcelCacheManager._process_produtos_data.
+
+Uso (na pasta backend_excel):
+    python benchmark_produtos.py --produtos 5000 --precos 5000
+"""
+
+import argparse
+import tempfile
+import time
+import pandas as pd
+from src.utils.cache_manager import ExcelCacheManager
+from src.utils.email_notifier import email_notifier
+
+def gerar_catalogo(n_produtos, n_precos):
+    """Gera Base_Produtos e B_Precos sintéticos (com códigos sem preço e preços duplicados)."""
+    df_produtos = pd.DataFrame({
+        'NomeProduto': [f'Produto {i}' for i in range(n_produtos)],
+        '_CodigoReferenciaProduto': [f'COD{i:06d}' for i in range(n_produtos)],
+        'RANGE MAX_1': [f'{(i % 10 + 1) * 100}g' for i in range(n_produtos)]
+    })
+    # ~10% dos produtos sem preço e alguns códigos com duas linhas de preço
+    codigos = [f'COD{i:06d}' for i in range(n_precos) if i % 10 != 7]
+    codigos += codigos[:len(codigos) // 50]
+    df_precos = pd.DataFrame({
+        'Cod Produto': codigos,
+        'Preço Negócio - Atual': [float(i % 500) + 0.9 for i in range(len(codigos))]
+    })
+    return df_produtos, df_precos
+
+def produtos_iterrows(df_produtos, df_precos):
+    """Implementação anterior: O(produtos x preços)."""
+    produtos = []
+    for _, row in df_produtos.iterrows():
+        codigo = row['_CodigoReferenciaProduto']
+        preco = 0.0
+        mask = df_precos['Cod Produto'] == codigo
+        resultado = df_precos[mask]
+        if not resultado.empty:
+            preco = resultado.iloc[0]['Preço Negócio - Atual']
+        produtos.append({
+            'nome': row['NomeProduto'],
+            'codigo': codigo,
+            'peso': row['RANGE MAX_1'],
+            'preco': float(preco)
+        })
+    return produtos
+
+def medir(funcao, repeticoes):
+    """Retorna (melhor tempo em segundos, resultado)."""
+    melhor = None
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        duracao = time.perf_counter() - inicio
+        melhor = duracao if melhor is None else min(melhor, duracao)
+    return melhor, resultado
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do cruzamento produtos x preços')
+    parser.add_argument('--produtos', type=int, default=5000)
+    parser.add_argument('--precos', type=int, default=5000)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    df_produtos, df_precos = gerar_catalogo(args.produtos, args.precos)
+    # Sem alertas por email durante o benchmark (o catálogo sintético tem produtos sem preço)
+    email_notifier._should_send_notification = lambda notification_type: False
+    cache = ExcelCacheManager(tempfile.mkdtemp())
+
+    tempo_antigo, antigo = medir(lambda: produtos_iterrows(df_produtos, df_precos), args.repeticoes)
+    tempo_novo, novo = medir(lambda: cache._process_produtos_data(df_produtos, df_precos), args.repeticoes)
+
+    relatorio = cache.reports['produtos']
+    print(f"Produtos: {args.produtos} | Linhas de preço: {len(df_precos)}")
+    print(f"iterrows + máscara: {tempo_antigo * 1000:10.1f} ms")
+    print(f"merge por código:   {tempo_novo * 1000:10.1f} ms")
+    print(f"Ganho: {tempo_antigo / tempo_novo:.1f}x")
+    print(f"Resultados iguais: {antigo == novo}")
+    print(f"Sem preço: {len(relatorio['sem_preco'])} | Códigos com preço duplicado: {len(relatorio['precos_duplicados'])}")
+
+if __name__ == '__main__':
+    main()
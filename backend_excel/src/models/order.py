@@ -0,0 +1,59 @@
+from src.models.user import db
+
+class Order(db.Model):
+    __tablename__ = 'pedido'
+
+    id = db.Column(db.Integer, primary_key=True)
+    id_pedido = db.Column(db.String(32), unique=True, nullable=False, index=True)
+    data_pedido = db.Column(db.DateTime, index=True)
+    aluno_nome = db.Column(db.String(200), index=True)
+    aluno_nome_busca = db.Column(db.String(200), index=True)  # casefold(), para busca sem diferenciar maiúsculas
+    aluno_sala = db.Column(db.String(50))
+    aluno_email = db.Column(db.String(200))
+    cliente_nome = db.Column(db.String(200), index=True)
+    cliente_nome_busca = db.Column(db.String(200), index=True)
+    cliente_email = db.Column(db.String(200))
+    cliente_cpf = db.Column(db.String(20))
+    cliente_telefone = db.Column(db.String(30))
+    tipo_entrega = db.Column(db.String(50))
+    loja_retirada = db.Column(db.String(200))
+    endereco_loja_retirada = db.Column(db.String(300))
+    endereco_entrega = db.Column(db.String(300))
+    data_entrega = db.Column(db.String(30))
+    condicao_entrega = db.Column(db.String(100))
+    forma_pagamento = db.Column(db.String(50))
+    itens_json = db.Column(db.Text)
+    itens_erro = db.Column(db.String(200))  # Problema encontrado ao decodificar itens_json (None se estava correto)
+    valor_total = db.Column(db.Float, default=0.0)
+    observacoes = db.Column(db.Text)
+
+    itens = db.relationship('OrderItem', backref='pedido', lazy='selectin', cascade='all, delete-orphan',
+                            order_by='OrderItem.numero')
+
+    def __repr__(self):
+        return f'<Order {self.id_pedido}>'
+
+class OrderItem(db.Model):
+    __tablename__ = 'item_pedido'
+
+    id = db.Column(db.Integer, primary_key=True)
+    pedido_id = db.Column(db.Integer, db.ForeignKey('pedido.id'), nullable=False, index=True)
+    numero = db.Column(db.Integer)
+    produto = db.Column(db.String(200), index=True)
+    codigo = db.Column(db.String(50), index=True)
+    quantidade = db.Column(db.Float, default=0.0)
+    preco_unitario = db.Column(db.Float)
+    valor_total = db.Column(db.Float)
+
+    def __repr__(self):
+        return f'<OrderItem {self.produto} x{self.quantidade}>'
+
+    def to_dict(self):
+        return {
+            'numero': self.numero,
+            'produto': self.produto,
+            'codigo': self.codigo,
+            'quantidade': self.quantidade,
+            'preco_unitario': self.preco_unitario,
+            'valor_total': self.valor_total
+        }
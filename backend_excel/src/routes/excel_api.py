@@ -3,38 +3,127 @@ Rotas da API para integração com arquivos Excel.
 Fornece endpoints para leitura e escrita de dados nas bases Excel com sistema de cache inteligente.
 """
 
-from flask import Blueprint, jsonify, request
-import pandas as pd
+from flask import Blueprint, current_app, jsonify, request, send_file, stream_with_context, url_for
 import os
 import json
 from datetime import datetime
 import uuid
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from src.utils.cache_manager import ExcelCacheManager
+from src.utils.order_journal import OrderJournal
+from src.utils.order_writer import GroupCommitWriter
+from src.utils.order_store import OrderStore, VENDAS_COLUMNS
+from src.utils.export_store import ExportStore
+from src.utils.encoded_body import EncodedBody, encoded_response
+from src.utils.pagination import CursorError, page_args, cursor_int, add_next_cursor
 
 excel_bp = Blueprint('excel', __name__)
 
 # Caminho base para os arquivos Excel
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data')
 
+# Leitor de planilhas: 'openpyxl', 'calamine' ou 'auto' (calamine quando python-calamine estiver instalado)
+EXCEL_READER = os.getenv('LEITOR_EXCEL', 'auto')
+
 # Instância global do gerenciador de cache
-cache_manager = ExcelCacheManager(DATA_DIR)
+cache_manager = ExcelCacheManager(
+    DATA_DIR,
+    parallel_workers=int(os.getenv('CACHE_PROCESSOS_LEITURA', str(os.cpu_count() or 1))),
+    reader_engine=EXCEL_READER
+)
 
-def save_excel_file(df, filename):
-    """Salva um DataFrame em um arquivo Excel."""
-    try:
-        filepath = os.path.join(DATA_DIR, filename)
-        df.to_excel(filepath, index=False)
-        return True
-    except Exception as e:
-        print(f"Erro ao salvar {filename}: {str(e)}")
-        return False
+# Quantidade de sugestões por consulta de autocompletar (padrão e máximo)
+SUGESTOES_PADRAO = 10
+SUGESTOES_MAXIMO = 50
+
+# Paginação por cursor (?limit=N): tamanho padrão e máximo das páginas
+PAGINA_PADRAO = 100
+PAGINA_MAXIMA = 1000
+
+# Segundos que POST /pedidos espera a gravação do seu lote antes de responder 202 (pendente)
+PEDIDO_ESPERA_MAXIMA = 30
+
+# Pesquisa em streaming (?stream=1): pedidos lidos da base por consulta
+STREAM_LOTE = 500
+
+# Base de pedidos em SQLite (Base_Vendas.xlsx fica como formato de importação/exportação)
+order_store = OrderStore(DATA_DIR, reader_engine=EXCEL_READER)
+
+# Planilhas exportadas pela pesquisa, disponíveis para download por EXPORTACOES_VALIDADE_MIN minutos
+export_store = ExportStore(
+    os.getenv('EXPORTACOES_DIR', os.path.join(os.path.dirname(DATA_DIR), 'exportacoes')),
+    ttl_seconds=int(os.getenv('EXPORTACOES_VALIDADE_MIN', '60')) * 60
+)
+
+# Diário de pedidos: grava cada pedido de forma durável e o aplica na base de pedidos em segundo plano
+order_journal = OrderJournal(DATA_DIR, order_store.apply_orders)
+
+# Gravador único com commit em grupo: junta pedidos simultâneos em um só fsync
+order_writer = GroupCommitWriter(
+    order_journal,
+    max_batch_size=int(os.getenv('PEDIDOS_LOTE_MAXIMO', '64')),
+    max_latency=float(os.getenv('PEDIDOS_LATENCIA_MAXIMA_MS', '5')) / 1000
+)
+
+def init_excel_api(app):
+    """
+    Inicia os serviços de segundo plano da API: carga inicial e monitoramento do cache,
+    base de pedidos (importação inicial), reaplicação do diário, threads de gravação e
+    limpeza das exportações vencidas.
+    """
+    cache_manager.start()
+    order_store.init_app(app)
+    order_journal.start()
+    order_writer.start()
+    export_store.cleanup()
+
+@excel_bp.cli.command('importar-vendas')
+def importar_vendas_command():
+    """Importa Base_Vendas.xlsx para a base de pedidos (pedidos já existentes são ignorados)."""
+    importados = order_store.import_excel()
+    print(f"{importados} pedido(s) importados de {order_store.legacy_filename}")
+
+@excel_bp.cli.command('exportar-vendas')
+def exportar_vendas_command():
+    """Exporta a base de pedidos completa para Base_Vendas.xlsx."""
+    order_journal.compact()
+    exportados = order_store.export_excel()
+    print(f"{exportados} pedido(s) exportados para {order_store.legacy_filename}")
+
+def lista_do_cache(nome, montar):
+    """
+    Resposta de uma lista do cache. Sem limit, o corpo inteiro pré-codificado (ETag/304);
+    com limit, uma página a partir da posição do cursor, válido só para a mesma versão da lista.
+    """
+    def codificar(snapshot):
+        itens = montar(snapshot)
+        return itens, EncodedBody.from_data(itens)
+
+    # Lista e corpo codificado do mesmo snapshot (a versão do cursor é a ETag desse corpo)
+    itens, encoded = cache_manager.get_encoded(nome, codificar)
+    limit, cursor = page_args(PAGINA_PADRAO, PAGINA_MAXIMA)
+    if limit is None:
+        return encoded_response(encoded)
+
+    versao = encoded.etag[:16]  # Mesma lista em todos os workers, muda a cada alteração dos dados
+    inicio = 0
+    if cursor is not None:
+        if cursor.get('v') != versao:
+            return jsonify({'error': 'A lista mudou desde a primeira página; recomece sem cursor'}), 409
+        inicio = cursor_int(cursor, 'p')
+        if inicio < 0:
+            raise CursorError('Cursor inválido')
+    pagina = itens[inicio:inicio + limit]
+    fim = inicio + len(pagina)
+    return add_next_cursor(jsonify(pagina), {'v': versao, 'p': fim} if fim < len(itens) else None)
 
 @excel_bp.route('/alunos', methods=['GET'])
 def get_alunos():
     """Retorna a lista de alunos da base B_Alunos.xlsx (com cache)."""
     try:
-        alunos = cache_manager.get_alunos()
-        return jsonify(alunos)
+        return lista_do_cache('alunos', lambda s: s.alunos)
+    except CursorError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Erro ao carregar alunos: {str(e)}'}), 500
 
@@ -58,10 +147,10 @@ def buscar_aluno():
 def get_clientes():
     """Retorna a lista de clientes (com cache)."""
     try:
-        clientes = cache_manager.get_clientes()
         # Retornar apenas nome e email para o dropdown
-        clientes_dropdown = [{'nome': c['nome'], 'email': c['email']} for c in clientes if c['nome']]
-        return jsonify(clientes_dropdown)
+        return lista_do_cache('clientes', lambda s: [{'nome': c['nome'], 'email': c['email']} for c in s.clientes if c['nome']])
+    except CursorError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Erro ao carregar clientes: {str(e)}'}), 500
 
@@ -85,8 +174,7 @@ def buscar_cliente():
 def get_lojas():
     """Retorna a lista de lojas (com cache)."""
     try:
-        lojas = cache_manager.get_lojas()
-        return jsonify(lojas)
+        return encoded_response(cache_manager.get_encoded('lojas', lambda s: EncodedBody.from_data(s.lojas)))
     except Exception as e:
         return jsonify({'error': f'Erro ao carregar lojas: {str(e)}'}), 500
 
@@ -94,20 +182,23 @@ def get_lojas():
 def get_produtos():
     """Retorna a lista de produtos com preços (com cache)."""
     try:
-        produtos = cache_manager.get_produtos()
-        return jsonify(produtos)
+        return encoded_response(cache_manager.get_encoded('produtos', lambda s: EncodedBody.from_data(s.produtos)))
     except Exception as e:
         return jsonify({'error': f'Erro ao carregar produtos: {str(e)}'}), 500
 
 @excel_bp.route('/produtos/buscar', methods=['GET'])
 def buscar_produto():
-    """Busca um produto pelo nome (com cache)."""
+    """Busca um produto pelo nome ou pelo código (com cache)."""
     nome = request.args.get('nome', '').strip()
-    if not nome:
-        return jsonify({'error': 'Nome é obrigatório'}), 400
+    codigo = request.args.get('codigo', '').strip()
+    if not nome and not codigo:
+        return jsonify({'error': 'Nome ou código é obrigatório'}), 400
     
     try:
-        produto = cache_manager.buscar_produto(nome)
+        if codigo:
+            produto = cache_manager.buscar_produto_por_codigo(codigo)
+        else:
+            produto = cache_manager.buscar_produto(nome)
         if not produto:
             return jsonify({'error': 'Produto não encontrado'}), 404
         
@@ -115,21 +206,37 @@ def buscar_produto():
     except Exception as e:
         return jsonify({'error': f'Erro ao buscar produto: {str(e)}'}), 500
 
+@excel_bp.route('/<dataset>/sugerir', methods=['GET'])
+def sugerir(dataset):
+    """
+    Sugestões para os comboboxes (alunos, salas, clientes, lojas ou produtos): registros cujo
+    nome começa com q, sem diferenciar acentos e maiúsculas. Sem q, os primeiros em ordem alfabética.
+    """
+    termo = request.args.get('q', '')
+    try:
+        limit = min(max(int(request.args.get('limit', SUGESTOES_PADRAO)), 1), SUGESTOES_MAXIMO)
+    except ValueError:
+        return jsonify({'error': 'limit deve ser um número inteiro'}), 400
+
+    try:
+        sugestoes = cache_manager.sugerir(dataset, termo, limit)
+        if sugestoes is None:
+            return jsonify({'error': f'Conjunto de dados desconhecido: {dataset}'}), 404
+        if dataset == 'clientes':
+            # Mesmos campos da lista de clientes (dados completos em /clientes/buscar)
+            sugestoes = [{'nome': c['nome'], 'email': c['email']} for c in sugestoes]
+        return jsonify(sugestoes)
+    except Exception as e:
+        return jsonify({'error': f'Erro ao buscar sugestões: {str(e)}'}), 500
+
 @excel_bp.route('/pedidos', methods=['POST'])
 def salvar_pedido():
-    """Salva um pedido na base Base_Vendas.xlsx."""
+    """Salva um pedido no diário de pedidos (aplicado na base de pedidos em segundo plano)."""
     try:
         dados = request.get_json()
         if not dados:
             return jsonify({'error': 'Dados não fornecidos'}), 400
         
-        # Carregar arquivo de vendas existente
-        filepath = os.path.join(DATA_DIR, 'Base_Vendas.xlsx')
-        if not os.path.exists(filepath):
-            return jsonify({'error': 'Arquivo de vendas não encontrado'}), 404
-        
-        df_vendas = pd.read_excel(filepath)
-        
         # Gerar ID único para o pedido
         id_pedido = str(uuid.uuid4())[:8].upper()
         
@@ -160,56 +267,62 @@ def salvar_pedido():
         if novo_pedido['Tipo_Entrega'] in ["retirada_outras_lojas", "retirada_mercado_jf"]:
             nome_loja = novo_pedido['Loja_Retirada']
             if nome_loja:
-                lojas_disponiveis = cache_manager.get_lojas()
-                loja_encontrada = next((l for l in lojas_disponiveis if l["nome"] == nome_loja), None)
+                loja_encontrada = cache_manager.buscar_loja(nome_loja)
                 if loja_encontrada and loja_encontrada.get("ENDEREÇO"):
                     novo_pedido["Endereco_Loja_Retirada"] = loja_encontrada["ENDEREÇO"]
         
-        # Adicionar novo pedido ao DataFrame
-        df_vendas = pd.concat([df_vendas, pd.DataFrame([novo_pedido])], ignore_index=True)
-        
-        # Salvar arquivo
-        if save_excel_file(df_vendas, 'Base_Vendas.xlsx'):
+        # Gravar no diário via commit em grupo: a requisição espera só a confirmação do seu lote
+        try:
+            order_writer.write(novo_pedido, timeout=PEDIDO_ESPERA_MAXIMA)
+        except FuturesTimeoutError:
+            # O pedido continua na fila e será gravado: responder erro levaria o usuário a
+            # reenviar (com outro ID_Pedido) e o pedido ficaria duplicado
+            print(f"Pedido {id_pedido} ainda na fila de gravação após {PEDIDO_ESPERA_MAXIMA}s")
             return jsonify({
                 'success': True,
-                'message': 'Pedido salvo com sucesso!',
+                'status': 'pendente',
+                'message': 'Pedido recebido e em gravação. Não é necessário enviar novamente.',
                 'id_pedido': id_pedido
-            })
-        else:
+            }), 202
+        except Exception as e:
+            print(f"Erro ao gravar pedido no diário: {str(e)}")
             return jsonify({'error': 'Erro ao salvar pedido'}), 500
+        
+        return jsonify({
+            'success': True,
+            'message': 'Pedido salvo com sucesso!',
+            'id_pedido': id_pedido
+        })
             
     except Exception as e:
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
 @excel_bp.route('/pedidos', methods=['GET'])
 def get_pedidos():
-    """Retorna a lista de pedidos salvos."""
+    """Retorna a lista de pedidos salvos, na ordem de gravação (paginável com limit/cursor)."""
     try:
-        filepath = os.path.join(DATA_DIR, 'Base_Vendas.xlsx')
-        if not os.path.exists(filepath):
-            return jsonify({'error': 'Arquivo de vendas não encontrado'}), 404
-        
-        df = pd.read_excel(filepath)
-        
+        limit, cursor = page_args(PAGINA_PADRAO, PAGINA_MAXIMA)
+        after_id = cursor_int(cursor, 'id') if cursor is not None else None
+        # Um pedido a mais só para saber se existe próxima página
+        orders = order_store.list_orders(limit + 1 if limit else None, after_id)
+        proxima = limit is not None and len(orders) > limit
+        orders = orders[:limit] if limit else orders
+
         pedidos = []
-        for _, row in df.iterrows():
-            if pd.notna(row['ID_Pedido']) and row['ID_Pedido'] != '':
-                try:
-                    itens = json.loads(row['Itens_JSON']) if pd.notna(row['Itens_JSON']) else []
-                except:
-                    itens = []
-                
-                pedidos.append({
-                    'id': row['ID_Pedido'],
-                    'data': row['Data_Pedido'],
-                    'cliente': row['Nome_Cliente'],
-                    'valor_total': row['Valor_Total'],
-                    'itens': itens,
-                    'loja_retirada': row.get('Loja_Retirada', ''),
-                    'endereco_loja_retirada': row.get('Endereco_Loja_Retirada', '')
-                })
+        for order in orders:
+            pedidos.append({
+                'id': order.id_pedido,
+                'data': order.data_pedido.strftime('%Y-%m-%d %H:%M:%S') if order.data_pedido else '',
+                'cliente': order.cliente_nome or '',
+                'valor_total': order.valor_total,
+                'itens': [item.to_dict() for item in order.itens],  # Decodificados uma vez, na gravação
+                'loja_retirada': order.loja_retirada or '',
+                'endereco_loja_retirada': order.endereco_loja_retirada or ''
+            })
         
-        return jsonify(pedidos)
+        return add_next_cursor(jsonify(pedidos), {'id': orders[-1].id} if proxima else None)
+    except CursorError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Erro ao carregar pedidos: {str(e)}'}), 500
 
@@ -234,6 +347,11 @@ def get_cache_info():
     except Exception as e:
         return jsonify({'error': f'Erro ao obter informações do cache: {str(e)}'}), 500
 
+@excel_bp.route('/ping', methods=['GET'])
+def ping():
+    """Verificação rápida de disponibilidade da API (sem consultar base nem arquivos)."""
+    return jsonify({'api_status': 'online'})
+
 @excel_bp.route('/status', methods=['GET'])
 def get_status():
     """Retorna o status da API e dos arquivos Excel."""
@@ -251,6 +369,9 @@ def get_status():
         'api_status': 'online',
         'data_dir': DATA_DIR,
         'cache_info': cache_manager.get_cache_info(),
+        'total_pedidos': order_store.count(),
+        'diario_pedidos': order_journal.get_info(),
+        'gravador_pedidos': order_writer.get_info(),
         'arquivos': {}
     }
     
@@ -265,6 +386,64 @@ def get_status():
     return jsonify(status)
 
 
+def pedido_para_dict(order):
+    """Pedido da base -> dicionário da resposta da pesquisa."""
+    pedido = {
+        'id_pedido': order.id_pedido,
+        'data': order.data_pedido.strftime('%d/%m/%Y %H:%M') if order.data_pedido else '',
+        'aluno_nome': order.aluno_nome or '',
+        'aluno_sala': order.aluno_sala or '',
+        'cliente_nome': order.cliente_nome or '',
+        'cliente_email': order.cliente_email or '',
+        'cliente_cpf': order.cliente_cpf or '',
+        'cliente_telefone': order.cliente_telefone or '',
+        'tipo_entrega': order.tipo_entrega or '',
+        'loja_retirada': order.loja_retirada or '',
+        'endereco_loja_retirada': order.endereco_loja_retirada or '',
+        'endereco_entrega': order.endereco_entrega or '',
+        'data_entrega': order.data_entrega or '',
+        'forma_pagamento': order.forma_pagamento or '',
+        'valor_total': float(order.valor_total or 0),
+        'observacoes': order.observacoes or '',
+        'itens': [item.to_dict() for item in order.itens]  # Decodificados uma vez, na gravação
+    }
+    
+    # Itens_JSON que não pôde ser decodificado segue como texto
+    if order.itens_erro:
+        pedido['itens_raw'] = order.itens_json
+    return pedido
+
+def pesquisa_em_streaming(filtros):
+    """
+    Resposta completa da pesquisa gerada aos poucos: a lista JSON sai em pedaços enquanto os
+    pedidos são lidos da base em lotes (order_store.iter_search). Nem a lista de pedidos nem o
+    corpo inteiro ficam em memória, e o primeiro byte sai assim que o primeiro lote é lido.
+    """
+    dumps = current_app.json.dumps_bytes
+
+    def gerar():
+        yield b'['
+        pedaco = []
+        primeiro = True
+        try:
+            for order in order_store.iter_search(*filtros, batch_size=STREAM_LOTE):
+                if not primeiro:
+                    pedaco.append(b',')
+                primeiro = False
+                pedaco.append(dumps(pedido_para_dict(order)))
+                if len(pedaco) >= STREAM_LOTE:
+                    yield b''.join(pedaco)
+                    pedaco = []
+        except Exception as e:
+            # O status 200 já foi enviado: interrompe a lista (o cliente recebe um JSON incompleto)
+            print(f"Erro ao gerar pesquisa de pedidos em streaming: {e}")
+            return
+        pedaco.append(b']\n')
+        yield b''.join(pedaco)
+
+    # stream_with_context mantém a sessão da base aberta enquanto a resposta é enviada
+    return current_app.response_class(stream_with_context(gerar()), mimetype='application/json')
+
 @excel_bp.route('/pedidos/pesquisar', methods=['GET'])
 def pesquisar_pedidos():
     """Pesquisa pedidos por critérios específicos."""
@@ -274,200 +453,112 @@ def pesquisar_pedidos():
         data_inicio = request.args.get('data_inicio', '').strip()
         data_fim = request.args.get('data_fim', '').strip()
         id_pedido = request.args.get('id_pedido', '').strip()
-        
-        # Carregar dados de pedidos
-        pedidos_df = cache_manager.get_pedidos()
-        if pedidos_df is None or pedidos_df.empty:
-            return jsonify([])
-        
-        # Aplicar filtros
-        resultado = pedidos_df.copy()
-        
-        # Filtro por nome do aluno (busca parcial, case-insensitive)
-        if nome_aluno:
-            mask = resultado['Aluno_Nome'].str.contains(nome_aluno, case=False, na=False)
-            resultado = resultado[mask]
-        
-        # Filtro por ID do pedido (busca exata)
-        if id_pedido:
-            mask = resultado['ID_Pedido'].str.contains(id_pedido, case=False, na=False)
-            resultado = resultado[mask]
-        
-        # Filtro por data
-        if data_inicio or data_fim:
-            # Converter coluna de data para datetime se necessário
-            if 'Data' in resultado.columns:
-                resultado['Data'] = pd.to_datetime(resultado['Data'], errors='coerce')
-                
-                if data_inicio:
-                    data_inicio_dt = pd.to_datetime(data_inicio, errors='coerce')
-                    if not pd.isna(data_inicio_dt):
-                        resultado = resultado[resultado['Data'] >= data_inicio_dt]
-                
-                if data_fim:
-                    data_fim_dt = pd.to_datetime(data_fim, errors='coerce')
-                    if not pd.isna(data_fim_dt):
-                        # Incluir todo o dia final
-                        data_fim_dt = data_fim_dt + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
-                        resultado = resultado[resultado['Data'] <= data_fim_dt]
-        
-        # Ordenar por data (mais recentes primeiro)
-        if 'Data' in resultado.columns:
-            resultado = resultado.sort_values('Data', ascending=False)
-        
-        # Converter para lista de dicionários
-        pedidos_list = []
-        for _, row in resultado.iterrows():
-            pedido = {
-                'id_pedido': row.get('ID_Pedido', ''),
-                'data': row.get('Data', '').strftime('%d/%m/%Y %H:%M') if pd.notna(row.get('Data')) else '',
-                'aluno_nome': row.get('Aluno_Nome', ''),
-                'aluno_sala': row.get('Aluno_Sala', ''),
-                'cliente_nome': row.get('Cliente_Nome', ''),
-                'cliente_email': row.get('Cliente_Email', ''),
-                'cliente_cpf': row.get('Cliente_CPF', ''),
-                'cliente_telefone': row.get('Cliente_Telefone', ''),
-                'tipo_entrega': row.get('Tipo_Entrega', ''),
-                'loja_retirada': row.get('Loja_Retirada', ''),
-                'endereco_loja_retirada': row.get('Endereco_Loja_Retirada', ""),
-                'endereco_entrega': row.get('Endereco_Entrega', ''),
-                'data_entrega': row.get('Data_Entrega', ''),
-                'forma_pagamento': row.get('Forma_Pagamento', ''),
-                'valor_total': float(row.get('Valor_Total', 0)),
-                'observacoes': row.get('Observacoes', ''),
-                'itens': []
-            }
-            
-            # Processar itens do pedido (se estiver em formato JSON)
-            itens_str = row.get('Itens_JSON', '') # Alterado de 'Itens' para 'Itens_JSON'
-            if itens_str:
-                try:
-                    itens = json.loads(itens_str) if isinstance(itens_str, str) else itens_str
-                    if isinstance(itens, list):
-                        pedido['itens'] = itens
-                except:
-                    # Se não conseguir fazer parse do JSON, deixar como string
-                    pedido['itens_raw'] = itens_str
-            
-            pedidos_list.append(pedido)
-        
-        return jsonify(pedidos_list)
+        nome_cliente = request.args.get('nome_cliente', '').strip()
+        filtros = (nome_aluno, id_pedido, data_inicio, data_fim, nome_cliente)
+
+        # Paginação por chave (data, id) do último pedido da página anterior
+        limit, cursor = page_args(PAGINA_PADRAO, PAGINA_MAXIMA)
+        if limit is None and request.args.get('stream', '').strip().lower() in ('1', 'true', 'sim'):
+            # Resultado completo gerado aos poucos (períodos longos, muitos pedidos)
+            return pesquisa_em_streaming(filtros)
+        after = None
+        if cursor is not None:
+            try:
+                data = datetime.fromisoformat(cursor['d']) if cursor.get('d') is not None else None
+            except (TypeError, ValueError):
+                raise CursorError('Cursor inválido') from None
+            after = (data, cursor_int(cursor, 'id'))
+        
+        # Consulta indexada na base de pedidos (mais recentes primeiro)
+        resultado = order_store.search(*filtros, limit=limit + 1 if limit else None, after=after)
+        proxima = limit is not None and len(resultado) > limit
+        resultado = resultado[:limit] if limit else resultado
+        
+        pedidos_list = [pedido_para_dict(order) for order in resultado]
+        
+        response = jsonify(pedidos_list)
+        if limit is not None and cursor is None:
+            # Total da pesquisa só na primeira página
+            response.headers['X-Total-Count'] = str(order_store.count_search(*filtros))
+        ultimo = resultado[-1] if proxima else None
+        return add_next_cursor(response, {
+            'd': ultimo.data_pedido.isoformat() if ultimo.data_pedido else None,
+            'id': ultimo.id
+        } if ultimo else None)
+    
+    except CursorError as e:
+        return jsonify({'error': str(e)}), 400
         
     except Exception as e:
         return jsonify({'error': f'Erro ao pesquisar pedidos: {str(e)}'}), 500
 
 @excel_bp.route('/pedidos/exportar', methods=['POST'])
 def exportar_pedidos():
-    """Exporta pedidos filtrados para Excel."""
+    """
+    Exporta o resultado da pesquisa para Excel. A planilha é gravada linha a linha, com os
+    pedidos lidos da base em lotes, e fica disponível para download em download_url.
+    """
     try:
         # Receber critérios de pesquisa do corpo da requisição
         data = request.get_json() or {}
-        nome_aluno = data.get('nome_aluno', '').strip()
-        data_inicio = data.get('data_inicio', '').strip()
-        data_fim = data.get('data_fim', '').strip()
-        id_pedido = data.get('id_pedido', '').strip()
-        
-        # Usar a mesma lógica de pesquisa
-        pedidos_df = cache_manager.get_pedidos()
-        if pedidos_df is None or pedidos_df.empty:
-            return jsonify({'error': 'Nenhum pedido encontrado'}), 404
-        
-        # Aplicar os mesmos filtros da pesquisa
-        resultado = pedidos_df.copy()
-        
-        if nome_aluno:
-            mask = resultado['Aluno_Nome'].str.contains(nome_aluno, case=False, na=False)
-            resultado = resultado[mask]
-        
-        if id_pedido:
-            mask = resultado['ID_Pedido'].str.contains(id_pedido, case=False, na=False)
-            resultado = resultado[mask]
-        
-        if data_inicio or data_fim:
-            if 'Data' in resultado.columns:
-                resultado['Data'] = pd.to_datetime(resultado['Data'], errors='coerce')
-                
-                if data_inicio:
-                    data_inicio_dt = pd.to_datetime(data_inicio, errors='coerce')
-                    if not pd.isna(data_inicio_dt):
-                        resultado = resultado[resultado['Data'] >= data_inicio_dt]
-                
-                if data_fim:
-                    data_fim_dt = pd.to_datetime(data_fim, errors='coerce')
-                    if not pd.isna(data_fim_dt):
-                        data_fim_dt = data_fim_dt + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
-                        resultado = resultado[resultado['Data'] <= data_fim_dt]
-        
-        if resultado.empty:
+        nome_aluno = (data.get('nome_aluno') or '').strip()
+        data_inicio = (data.get('data_inicio') or '').strip()
+        data_fim = (data.get('data_fim') or '').strip()
+        id_pedido = (data.get('id_pedido') or '').strip()
+        nome_cliente = (data.get('nome_cliente') or '').strip()
+        filtros = (nome_aluno, id_pedido, data_inicio, data_fim, nome_cliente)
+        
+        # Usar a mesma consulta da pesquisa
+        if not order_store.count_search(*filtros):
             return jsonify({'error': 'Nenhum pedido encontrado com os critérios especificados'}), 404
         
-        # Criar arquivo Excel temporário
-        import tempfile
-        import os
-        from datetime import datetime
+        colunas = [columns[0] for columns in VENDAS_COLUMNS.values()]
+        
+        def linhas():
+            enderecos = {}
+            for order in order_store.iter_search(*filtros, batch_size=STREAM_LOTE):
+                record = order_store.to_record(order)
+                # Completar Endereco_Loja_Retirada de pedidos antigos que não o gravaram
+                loja_nome = record['Loja_Retirada']
+                if not record['Endereco_Loja_Retirada'] and loja_nome:
+                    if loja_nome not in enderecos:
+                        loja = cache_manager.buscar_loja(loja_nome)
+                        enderecos[loja_nome] = (loja.get('ENDEREÇO') or '') if loja else ''
+                    record['Endereco_Loja_Retirada'] = enderecos[loja_nome]
+                yield [record[coluna] for coluna in colunas]
         
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f'pedidos_exportados_{timestamp}.xlsx'
-        temp_path = os.path.join(tempfile.gettempdir(), filename)
-        
-        # Salvar no Excel
-        resultado.to_excel(temp_path, index=False)
-        
-        # Adicionar Endereco_Loja_Retirada ao DataFrame antes de exportar
-        if 'Loja_Retirada' in resultado.columns and 'Endereco_Loja_Retirada' not in resultado.columns:
-            lojas_disponiveis = cache_manager.get_lojas()
-            endereco_map = {loja['nome']: loja.get('ENDEREÇO', '') for loja in lojas_disponiveis}
-            resultado['Endereco_Loja_Retirada'] = resultado['Loja_Retirada'].map(endereco_map).fillna('')
-
-        resultado.to_excel(temp_path, index=False)
+        token, total = export_store.create(colunas, linhas(), filename)
         
         # Retornar informações sobre o arquivo
         return jsonify({
             'success': True,
             'filename': filename,
-            'total_pedidos': len(resultado),
-            'temp_path': temp_path,
-            'message': f'Exportados {len(resultado)} pedidos para Excel'
+            'total_pedidos': total,
+            'download_url': url_for('.baixar_exportacao', token=token),
+            'expira_em_minutos': export_store.ttl_seconds // 60,
+            'message': f'Exportados {total} pedidos para Excel'
         })
         
     except Exception as e:
         return jsonify({'error': f'Erro ao exportar pedidos: {str(e)}'}), 500
 
+@excel_bp.route('/pedidos/exportacoes/<token>', methods=['GET'])
+def baixar_exportacao(token):
+    """Download de uma planilha gerada por /pedidos/exportar (enquanto não vencer)."""
+    exportacao = export_store.find(token)
+    if exportacao is None:
+        return jsonify({'error': 'Exportação não encontrada ou expirada'}), 404
+    path, filename = exportacao
+    return send_file(path, as_attachment=True, download_name=filename,
+                     mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+
 @excel_bp.route('/pedidos/estatisticas', methods=['GET'])
 def estatisticas_pedidos():
     """Retorna estatísticas gerais dos pedidos."""
     try:
-        pedidos_df = cache_manager.get_pedidos()
-        if pedidos_df is None or pedidos_df.empty:
-            return jsonify({
-                'total_pedidos': 0,
-                'valor_total': 0,
-                'pedidos_hoje': 0,
-                'pedidos_semana': 0,
-                'pedidos_mes': 0
-            })
-        
-        # Converter data para datetime
-        if 'Data' in pedidos_df.columns:
-            pedidos_df['Data'] = pd.to_datetime(pedidos_df['Data'], errors='coerce')
-        
-        # Data atual
-        hoje = pd.Timestamp.now().normalize()
-        inicio_semana = hoje - pd.Timedelta(days=hoje.weekday())
-        inicio_mes = hoje.replace(day=1)
-        
-        # Calcular estatísticas
-        stats = {
-            'total_pedidos': len(pedidos_df),
-            'valor_total': float(pedidos_df.get('Valor_Total', 0).sum()),
-            'pedidos_hoje': len(pedidos_df[pedidos_df['Data'].dt.normalize() == hoje]) if 'Data' in pedidos_df.columns else 0,
-            'pedidos_semana': len(pedidos_df[pedidos_df['Data'] >= inicio_semana]) if 'Data' in pedidos_df.columns else 0,
-            'pedidos_mes': len(pedidos_df[pedidos_df['Data'] >= inicio_mes]) if 'Data' in pedidos_df.columns else 0,
-            'ultimo_pedido': pedidos_df['Data'].max().strftime('%d/%m/%Y %H:%M') if 'Data' in pedidos_df.columns and not pedidos_df['Data'].isna().all() else 'Nenhum'
-        }
-        
-        return jsonify(stats)
+        return jsonify(order_store.stats())
         
     except Exception as e:
         return jsonify({'error': f'Erro ao calcular estatísticas: {str(e)}'}), 500
-
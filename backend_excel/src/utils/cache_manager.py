@@ -1,84 +1,177 @@
 """
 Sistema de cache inteligente para dados Excel.
-Monitora modificações nos arquivos e atualiza o cache automaticamente.
+Monitora modificações nos arquivos em segundo plano e atualiza o cache automaticamente.
 Inclui validação de dados sujos e notificação silenciosa de erros.
 """
 
 import os
 import json
+import time
+import multiprocessing
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 from threading import Lock
-import hashlib
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 from .data_validator import DataValidator
 from .email_notifier import email_notifier
+from .excel_reader import read_excel, resolve_engine
+from .excel_schema import EXCEL_SCHEMAS
+from .file_watcher import DataDirWatcher
+from .prefix_index import PrefixIndex
+from .snapshot_sidecar import SnapshotSidecar, file_fingerprint
+
+# Processos de leitura não são criados por fork deste processo: ele já tem threads (monitor da pasta,
+# gravador de pedidos, requisições) e o filho poderia herdar uma trava presa por uma delas. O forkserver
+# é um processo novo, sem threads, que cria os processos de leitura (spawn onde não há forkserver).
+# Esses processos reimportam o script principal; o main.py só monta a aplicação em create_app().
+_POOL_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+if _POOL_CONTEXT.get_start_method() == 'forkserver':
+    # Leitores (pandas/openpyxl) e Flask/SQLAlchemy, que o script principal reimporta, já carregados no
+    # forkserver: cada processo de leitura começa sem repetir essas importações
+    _POOL_CONTEXT.set_forkserver_preload([__name__, 'flask_sqlalchemy'])
+
+# Colunas de B_Lojas.xlsx -> campos servidos para cada loja
+LOJAS_COLUMNS = {
+    'COD': 'COD',
+    'Nome oficial': 'nome',
+    'ENDEREÇO': 'ENDEREÇO',
+    'CEP': 'CEP',
+    'Região IM': 'Região IM',
+    'NM_DIST': 'NM_DIST',
+    'NM_MUN': 'NM_MUN',
+    'NM_MESO': 'NM_MESO',
+    'SIGLA_UF': 'SIGLA_UF',
+    'Região_Geográfica': 'Região_Geográfica',
+    'LAT': 'LAT',
+    'LONG': 'LONG'
+}
+
+def _records(df, columns):
+    """Converte colunas de um DataFrame em lista de dicionários (vazios/NaN viram None)."""
+    values = [df[column].astype(object).where(df[column].notna(), None).to_numpy() for column in columns]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+def _last_per_key(df, columns):
+    """
+    Seleciona e renomeia colunas, mantendo uma linha por 'nome': os valores da última
+    ocorrência, na posição da primeira (mesma semântica de atribuir num dicionário).
+    """
+    if df is None:
+        return pd.DataFrame(columns=list(columns.values()), dtype=object)
+    selected = df[list(columns)].rename(columns=columns)
+    selected['nome'] = selected['nome'].astype(object)  # Mesmo tipo de chave nas duas bases
+    codes, _ = pd.factorize(selected['nome'], use_na_sentinel=False)
+    last_rows = pd.Series(np.arange(len(selected))).groupby(codes, sort=True).last().to_numpy()
+    return selected.iloc[last_rows].reset_index(drop=True)
+
+def _read_workbook(filepath, engine):
+    """Lê uma planilha em um processo do pool de leitura."""
+    return read_excel(filepath, engine, EXCEL_SCHEMAS.get(os.path.basename(filepath)))
+
+def _index_by(records, key):
+    """Índice chave -> registro; com chaves repetidas vale o primeiro registro (como a busca linear)."""
+    index = {}
+    for record in records:
+        index.setdefault(record[key], record)
+    return index
+
+def _salas(alunos):
+    """Salas (séries) distintas dos alunos, na ordem em que aparecem."""
+    return [{'sala': serie} for serie in dict.fromkeys(aluno['serie'] for aluno in alunos if aluno.get('serie'))]
+
+class CacheSnapshot:
+    """
+    Versão imutável dos dados em cache.
+    Os dados e índices nunca são alterados depois de publicados: cada recarga monta um novo
+    snapshot e o publica trocando uma única referência, então leitores não precisam de trava.
+    A exceção é encoded_bodies, memo preenchido no primeiro uso (get_encoded): gravações
+    simultâneas da mesma chave guardam o mesmo resultado, então a corrida é inofensiva.
+    """
+    __slots__ = ('version', 'created_at', 'alunos', 'clientes', 'lojas', 'produtos',
+                 'alunos_por_nome', 'clientes_por_nome', 'lojas_por_nome', 'produtos_por_nome', 'produtos_por_codigo',
+                 'sugestoes', 'encoded_bodies')
+
+    def __init__(self, version=0, created_at=None, alunos=None, clientes=None, lojas=None, produtos=None):
+        self.version = version
+        self.created_at = created_at
+        self.alunos = alunos if alunos is not None else []
+        self.clientes = clientes if clientes is not None else []
+        self.lojas = lojas if lojas is not None else []
+        self.produtos = produtos if produtos is not None else []
+        # Índices para buscas exatas em O(1), montados uma vez por snapshot
+        self.alunos_por_nome = _index_by(self.alunos, 'nome')
+        self.clientes_por_nome = _index_by(self.clientes, 'nome')
+        self.lojas_por_nome = _index_by(self.lojas, 'nome')
+        self.produtos_por_nome = _index_by(self.produtos, 'nome')
+        self.produtos_por_codigo = _index_by(self.produtos, 'codigo')
+        # Índices de prefixo (sem acentos/maiúsculas) para as sugestões dos comboboxes
+        self.sugestoes = {
+            'alunos': PrefixIndex(self.alunos, 'nome'),
+            'salas': PrefixIndex(_salas(self.alunos), 'sala'),
+            'clientes': PrefixIndex(self.clientes, 'nome'),
+            'lojas': PrefixIndex(self.lojas, 'nome'),
+            'produtos': PrefixIndex(self.produtos, 'nome')
+        }
+        # Respostas já codificadas, preenchidas na primeira requisição (ver get_encoded)
+        self.encoded_bodies = {}
+
+    @property
+    def loaded(self):
+        return self.version > 0
+
+    def age_seconds(self):
+        """Idade do snapshot em segundos."""
+        if self.created_at is None:
+            return None
+        return (datetime.now() - self.created_at).total_seconds()
 
 class ExcelCacheManager:
-    def __init__(self, data_dir):
+    # Arquivos monitorados pelo cache
+    files_to_check = [
+        'B_Alunos.xlsx',
+        'Base_cadastos.xlsx',
+        'Base Clientes.xlsx',
+        'B_Lojas.xlsx',
+        'Base_Produtos.xlsx',
+        'B_Precos.xlsx'
+    ]
+
+    # Planilhas de origem de cada conjunto de dados
+    dataset_sources = {
+        'alunos': ['B_Alunos.xlsx'],
+        'clientes': ['Base_cadastos.xlsx', 'Base Clientes.xlsx'],
+        'lojas': ['B_Lojas.xlsx'],
+        'produtos': ['Base_Produtos.xlsx', 'B_Precos.xlsx']
+    }
+
+    # Abaixo deste total de bytes a criar processos custa mais do que ler em sequência
+    parallel_min_bytes = 256 * 1024
+    # Tempo máximo (s) da leitura paralela; depois disso o pool é encerrado e a leitura refeita em sequência
+    parallel_timeout = 300
+
+    def __init__(self, data_dir, poll_interval=2, sidecar_filename='.cache_snapshot.pkl', parallel_workers=None,
+                 reader_engine=None):
         self.data_dir = data_dir
-        self.cache = {}
-        self.file_timestamps = {}
-        self.file_hashes = {}
-        self.cache_lock = Lock()
-        self.last_check = None
-        self.check_interval = timedelta(minutes=5)  # Verificar a cada 5 minutos
+        # Leitor de planilhas: 'openpyxl', 'calamine' ou 'auto' (calamine quando instalado)
+        self.reader_engine = resolve_engine(reader_engine)
+        # Processos para ler planilhas em paralelo nas recargas (1 = sequencial)
+        self.parallel_workers = parallel_workers if parallel_workers is not None else (os.cpu_count() or 1)
+        self.last_load_mode = None
+        self.last_rebuild_ms = None
+        self.snapshot = CacheSnapshot()  # Snapshot publicado (lido sem trava)
+        self.rebuild_lock = Lock()       # Serializa apenas as recargas
         self.validator = DataValidator()
-        
-    def _get_file_hash(self, filepath):
-        """Calcula o hash MD5 de um arquivo."""
-        if not os.path.exists(filepath):
-            return None
-        
-        try:
-            hash_md5 = hashlib.md5()
-            with open(filepath, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_md5.update(chunk)
-            return hash_md5.hexdigest()
-        except Exception as e:
-            email_notifier.notify_file_access_error(os.path.basename(filepath), str(e))
-            return None
-    
-    def _should_check_files(self):
-        """Verifica se é hora de checar os arquivos novamente."""
-        if self.last_check is None:
-            return True
-        
-        now = datetime.now()
-        return (now - self.last_check) > self.check_interval
-    
-    def _is_file_modified(self, filename):
-        """Verifica se um arquivo foi modificado desde a última verificação."""
-        filepath = os.path.join(self.data_dir, filename)
-        
-        if not os.path.exists(filepath):
-            return False
-        
-        try:
-            # Verificar timestamp
-            current_mtime = os.path.getmtime(filepath)
-            if filename not in self.file_timestamps:
-                self.file_timestamps[filename] = current_mtime
-                return True
-            
-            if current_mtime != self.file_timestamps[filename]:
-                self.file_timestamps[filename] = current_mtime
-                return True
-            
-            # Verificar hash como backup (mais confiável)
-            current_hash = self._get_file_hash(filepath)
-            if filename not in self.file_hashes:
-                self.file_hashes[filename] = current_hash
-                return True
-            
-            if current_hash != self.file_hashes[filename]:
-                self.file_hashes[filename] = current_hash
-                return True
-            
-            return False
-        except Exception as e:
-            email_notifier.notify_file_access_error(filename, str(e))
-            return False
+        # Dados já processados persistidos em disco, para inicialização rápida
+        self.sidecar = SnapshotSidecar(os.path.join(data_dir, sidecar_filename))
+        self.sidecar_hits = []
+        # Relatórios gerados no processamento (ex.: produtos sem preço), por conjunto de dados
+        self.reports = {}
+        # Detecção de mudanças fora do caminho das requisições
+        self.watcher = DataDirWatcher(data_dir, self.files_to_check, self._reload, poll_interval=poll_interval)
     
     def _load_excel_data(self, filename):
         """Carrega dados de um arquivo Excel com tratamento de erros."""
@@ -87,7 +180,9 @@ class ExcelCacheManager:
             if not os.path.exists(filepath):
                 email_notifier.notify_file_access_error(filename, "Arquivo não encontrado")
                 return None
-            return pd.read_excel(filepath)
+            # Trava compartilhada: nunca lê uma planilha enquanto outro processo a publica.
+            # Só as colunas do esquema registrado são lidas, já com os tipos declarados.
+            return read_excel(filepath, self.reader_engine, EXCEL_SCHEMAS.get(filename))
         except Exception as e:
             email_notifier.notify_file_access_error(filename, str(e))
             return None
@@ -112,224 +207,326 @@ class ExcelCacheManager:
             return []
     
     def _process_clientes_data(self, df_cadastros, df_clientes):
-        """Processa dados dos clientes combinando as duas bases."""
-        clientes = {}
-        
-        # Processar cadastros
-        if df_cadastros is not None:
-            for _, row in df_cadastros.iterrows():
-                nome = row['Digite o nome completo do cliente']
-                clientes[nome] = {
-                    'nome': nome,
-                    'email': row['Digite o e-mail do cliente:'],
-                    'cpf': None,
-                    'telefone': None,
-                    'endereco': None
-                }
+        """
+        Processa dados dos clientes combinando as duas bases (merge externo pelo nome).
+        Nomes repetidos numa mesma base: vale a última linha. Ordem: nomes de Base_cadastos
+        na ordem em que aparecem, depois os que só existem em Base Clientes.
+        """
+        cadastros = _last_per_key(df_cadastros, {
+            'Digite o nome completo do cliente': 'nome',
+            'Digite o e-mail do cliente:': 'email'
+        })
+        clientes = _last_per_key(df_clientes, {
+            'Digite o nome completo do cliente': 'nome',
+            'CPF Cliente': 'cpf',
+            'Telefone Cliente': 'telefone',
+            'Endereço completo Cliente': 'endereco'
+        })
         
-        # Adicionar dados da base de clientes
-        if df_clientes is not None:
-            for _, row in df_clientes.iterrows():
-                nome = row['Digite o nome completo do cliente']
-                if nome in clientes:
-                    clientes[nome].update({
-                        'cpf': row['CPF Cliente'],
-                        'telefone': row['Telefone Cliente'],
-                        'endereco': row['Endereço completo Cliente']
-                    })
-                else:
-                    clientes[nome] = {
-                        'nome': nome,
-                        'email': None,
-                        'cpf': row['CPF Cliente'],
-                        'telefone': row['Telefone Cliente'],
-                        'endereco': row['Endereço completo Cliente']
-                    }
+        cadastros['ordem_cadastro'] = np.arange(len(cadastros))
+        clientes['ordem_cliente'] = np.arange(len(clientes))
+        merged = cadastros.merge(clientes, on='nome', how='outer', validate='one_to_one')
+        ordem = merged['ordem_cadastro'].fillna(len(cadastros) + merged['ordem_cliente'])
+        merged = merged.iloc[np.argsort(ordem.to_numpy(), kind='stable')]
         
-        return list(clientes.values())
+        return _records(merged, ['nome', 'email', 'cpf', 'telefone', 'endereco'])
     
     def _process_lojas_data(self, df):
-        """Processa dados das lojas."""
+        """Processa dados das lojas (seleção e renomeação de colunas; colunas ausentes ficam '')."""
         if df is None:
             return []
         
-        lojas = []
-        for _, row in df.iterrows():
-            lojas.append({
-                'COD': row.get('COD', ''),
-                'nome': row.get('Nome oficial', ''),
-                'ENDEREÇO': row.get('ENDEREÇO', ''),
-                'CEP': row.get('CEP', ''),
-                'Região IM': row.get('Região IM', ''),
-                'NM_DIST': row.get('NM_DIST', ''),
-                'NM_MUN': row.get('NM_MUN', ''),
-                'NM_MESO': row.get('NM_MESO', ''),
-                'SIGLA_UF': row.get('SIGLA_UF', ''),
-                'Região_Geográfica': row.get('Região_Geográfica', ''),
-                'LAT': row.get('LAT', ''),
-                'LONG': row.get('LONG', '')
-            })
-        return lojas
+        lojas = pd.DataFrame(index=df.index)
+        for origem, destino in LOJAS_COLUMNS.items():
+            lojas[destino] = df[origem] if origem in df.columns else ''
+        return _records(lojas, list(lojas.columns))
     
     def _process_produtos_data(self, df_produtos, df_precos):
-        """Processa dados dos produtos com preços."""
+        """
+        Processa dados dos produtos com preços.
+        O preço vem de B_Precos.xlsx por um único merge pelo código do produto. Se o código
+        aparecer em mais de uma linha de preço, vale a primeira linha da planilha.
+        Produtos sem preço ficam com 0.0 e, junto com os códigos de preço duplicados, vão para
+        o relatório de preços (reports['produtos']).
+        """
         if df_produtos is None:
+            self.reports['produtos'] = {'sem_preco': [], 'precos_duplicados': []}
             return []
         
-        produtos = []
-        for _, row in df_produtos.iterrows():
-            codigo = row['_CodigoReferenciaProduto']
-            preco = 0.0
-            
-            # Buscar preço
-            if df_precos is not None:
-                mask = df_precos['Cod Produto'] == codigo
-                resultado = df_precos[mask]
-                if not resultado.empty:
-                    preco = resultado.iloc[0]['Preço Negócio - Atual']
-            
-            produtos.append({
-                'nome': row['NomeProduto'],
-                'codigo': codigo,
-                'peso': row['RANGE MAX_1'],
-                'preco': float(preco)
-            })
+        codigos = df_produtos['_CodigoReferenciaProduto']
+        if df_precos is not None:
+            precos = df_precos[['Cod Produto', 'Preço Negócio - Atual']].dropna(subset=['Cod Produto'])
+            duplicados = precos.loc[precos['Cod Produto'].duplicated(), 'Cod Produto'].unique().tolist()
+            precos = precos.drop_duplicates('Cod Produto', keep='first')
+            # Junção por chave: cada produto procura seu preço uma vez (left join, ordem dos produtos mantida)
+            merged = df_produtos.merge(precos, how='left', left_on='_CodigoReferenciaProduto',
+                                       right_on='Cod Produto', sort=False)
+            tem_preco = merged['Cod Produto'].notna().to_numpy()
+            preco = pd.to_numeric(merged['Preço Negócio - Atual'], errors='coerce').fillna(0.0)
+        else:
+            duplicados = []
+            tem_preco = [False] * len(df_produtos)
+            preco = pd.Series(0.0, index=df_produtos.index)
+        
+        produtos = [
+            {'nome': nome, 'codigo': codigo, 'peso': peso, 'preco': float(valor)}
+            for nome, codigo, peso, valor in zip(df_produtos['NomeProduto'], codigos,
+                                                  df_produtos['RANGE MAX_1'], preco)
+        ]
+        
+        sem_preco = [
+            {'codigo': produto['codigo'], 'nome': produto['nome']}
+            for produto, encontrado in zip(produtos, tem_preco) if not encontrado
+        ]
+        self.reports['produtos'] = {'sem_preco': sem_preco, 'precos_duplicados': duplicados}
+        
+        problemas = [{'type': 'Produto sem preço', **item} for item in sem_preco]
+        problemas += [{'type': 'Preço duplicado (vale a primeira linha)', 'codigo': codigo} for codigo in duplicados]
+        if problemas:
+            email_notifier.notify_validation_errors('B_Precos.xlsx', problemas)
+        
         return produtos
     
-    def _update_cache_if_needed(self):
-        """Atualiza o cache se necessário."""
-        with self.cache_lock:
-            if not self._should_check_files():
-                return
-            
-            self.last_check = datetime.now()
-            
-            # Lista de arquivos para monitorar
-            files_to_check = [
-                'B_Alunos.xlsx',
-                'Base_cadastos.xlsx',
-                'Base Clientes.xlsx',
-                'B_Lojas.xlsx',
-                'Base_Produtos.xlsx',
-                'B_Precos.xlsx',
-                'Base_Vendas.xlsx'
-            ]
-            
-            # Verificar quais arquivos foram modificados
-            modified_files = []
-            for filename in files_to_check:
-                if self._is_file_modified(filename):
-                    modified_files.append(filename)
-            
-            if not modified_files and self.cache:
-                return  # Nenhum arquivo modificado e cache já existe
-            
-            print(f"Atualizando cache. Arquivos modificados: {modified_files}")
-            
-            # Recarregar dados dos arquivos modificados ou todos se for primeira vez
-            if 'B_Alunos.xlsx' in modified_files or 'alunos' not in self.cache:
-                df_alunos = self._load_excel_data('B_Alunos.xlsx')
-                self.cache['alunos'] = self._process_alunos_data(df_alunos)
-            
-            if any(f in modified_files for f in ['Base_cadastos.xlsx', 'Base Clientes.xlsx']) or 'clientes' not in self.cache:
-                df_cadastros = self._load_excel_data('Base_cadastos.xlsx')
-                df_clientes = self._load_excel_data('Base Clientes.xlsx')
-                self.cache['clientes'] = self._process_clientes_data(df_cadastros, df_clientes)
-            
-            if 'B_Lojas.xlsx' in modified_files or 'lojas' not in self.cache:
-                df_lojas = self._load_excel_data('B_Lojas.xlsx')
-                self.cache['lojas'] = self._process_lojas_data(df_lojas)
-            
-            if any(f in modified_files for f in ['Base_Produtos.xlsx', 'B_Precos.xlsx']) or 'produtos' not in self.cache:
-                df_produtos = self._load_excel_data('Base_Produtos.xlsx')
-                df_precos = self._load_excel_data('B_Precos.xlsx')
-                self.cache['produtos'] = self._process_produtos_data(df_produtos, df_precos)
-            
-            if 'Base_Vendas.xlsx' in modified_files or 'pedidos' not in self.cache:
-                df_pedidos = self._load_excel_data('Base_Vendas.xlsx')
-                self.cache['pedidos'] = df_pedidos if df_pedidos is not None else pd.DataFrame()
+    def _load_workbooks(self, filenames):
+        """
+        Lê as planilhas informadas e retorna {arquivo: DataFrame ou None}.
+        Com mais de uma planilha grande, a leitura (openpyxl, limitada por CPU) é feita em paralelo
+        num pool de processos: o tempo total fica limitado pela maior planilha, não pela soma.
+        """
+        frames = {}
+        pending = []
+        total_bytes = 0
+        for filename in filenames:
+            filepath = os.path.join(self.data_dir, filename)
+            if not os.path.exists(filepath):
+                email_notifier.notify_file_access_error(filename, "Arquivo não encontrado")
+                frames[filename] = None
+                continue
+            pending.append(filename)
+            total_bytes += os.path.getsize(filepath)
+        
+        workers = min(self.parallel_workers, len(pending))
+        if workers < 2 or total_bytes < self.parallel_min_bytes:
+            self.last_load_mode = 'sequencial'
+            for filename in pending:
+                frames[filename] = self._load_excel_data(filename)
+            return frames
+        
+        self.last_load_mode = 'paralelo'
+        pool = None
+        try:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=_POOL_CONTEXT)
+            futures = {
+                filename: pool.submit(_read_workbook, os.path.join(self.data_dir, filename), self.reader_engine)
+                for filename in pending
+            }
+            # Roda sob rebuild_lock: um processo travado não pode segurar o monitor e /cache/refresh
+            deadline = time.monotonic() + self.parallel_timeout
+            for filename, future in futures.items():
+                try:
+                    frames[filename] = future.result(timeout=max(deadline - time.monotonic(), 0))
+                except (BrokenProcessPool, FuturesTimeoutError):
+                    raise
+                except Exception as e:
+                    email_notifier.notify_file_access_error(filename, str(e))
+                    frames[filename] = None
+        except (BrokenProcessPool, FuturesTimeoutError, OSError) as e:
+            # Sem pool de processos (ex.: limite de processos) ou leitura travada: lê o que faltou no próprio processo
+            motivo = str(e) or f'sem resposta em {self.parallel_timeout}s'
+            print(f"Leitura paralela indisponível, lendo sequencialmente: {motivo}")
+            self.last_load_mode = 'sequencial'
+            if pool is not None:
+                # Sem esperar os processos: leituras que faltam são canceladas e um processo travado não segura a recarga
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool = None
+            for filename in pending:
+                if filename not in frames:
+                    frames[filename] = self._load_excel_data(filename)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return frames
+    
+    def _build_dataset(self, name, frames):
+        """Processa um conjunto de dados a partir das planilhas já lidas."""
+        if name == 'alunos':
+            return self._process_alunos_data(frames['B_Alunos.xlsx'])
+        if name == 'clientes':
+            return self._process_clientes_data(frames['Base_cadastos.xlsx'], frames['Base Clientes.xlsx'])
+        if name == 'lojas':
+            return self._process_lojas_data(frames['B_Lojas.xlsx'])
+        if name == 'produtos':
+            return self._process_produtos_data(frames['Base_Produtos.xlsx'], frames['B_Precos.xlsx'])
+        raise ValueError(f"Conjunto de dados desconhecido: {name}")
+    
+    def _rebuild(self, modified_files, use_sidecar=True):
+        """
+        Monta um novo snapshot com os dados afetados pelos arquivos modificados e o publica
+        (chamar com rebuild_lock). Enquanto isso, leitores continuam servindo o snapshot anterior.
+        Conjuntos cujas planilhas têm a mesma impressão digital do snapshot persistente não são reprocessados.
+        """
+        print(f"Atualizando cache. Arquivos modificados: {modified_files}")
+        started = time.monotonic()
+        current = self.snapshot
+        
+        # Datasets não afetados são reaproveitados do snapshot atual
+        datasets = {name: getattr(current, name) for name in self.dataset_sources}
+        sidecar_hits = []
+        to_build = {}
+        
+        # Recarregar dados dos arquivos modificados ou todos se for primeira vez
+        for name, sources in self.dataset_sources.items():
+            if current.loaded and not any(f in modified_files for f in sources):
+                continue
             
-            # Atualizar timestamp da última atualização
-            self.cache['last_updated'] = datetime.now().isoformat()
+            # Impressões digitais calculadas antes da leitura: se a planilha mudar durante
+            # o processamento, a próxima inicialização reprocessa
+            fingerprints = {f: file_fingerprint(os.path.join(self.data_dir, f)) for f in sources}
+            data = self.sidecar.get(name, fingerprints) if use_sidecar else None
+            if data is not None:
+                sidecar_hits.append(name)
+                datasets[name] = data
+                self.reports[name] = self.sidecar.get_report(name)
+            else:
+                to_build[name] = fingerprints
+        
+        if to_build:
+            # Todas as planilhas necessárias são lidas de uma vez (em paralelo quando possível)
+            filenames = [f for name in to_build for f in self.dataset_sources[name]]
+            frames = self._load_workbooks(filenames)
+            for name, fingerprints in to_build.items():
+                datasets[name] = self._build_dataset(name, frames)
+                self.sidecar.put(name, fingerprints, datasets[name], self.reports.get(name))
             
-            print(f"Cache atualizado em {self.cache['last_updated']}")
+            try:
+                self.sidecar.save()
+            except Exception as e:
+                print(f"Erro ao gravar snapshot persistente: {str(e)}")
+        
+        # Publicação: uma única troca de referência
+        self.snapshot = CacheSnapshot(
+            version=current.version + 1,
+            created_at=datetime.now(),
+            **datasets
+        )
+        self.sidecar_hits = sidecar_hits
+        self.last_rebuild_ms = round((time.monotonic() - started) * 1000, 1)
+        
+        print(f"Cache atualizado em {self.snapshot.created_at.isoformat()} (versão {self.snapshot.version}, "
+              f"do snapshot persistente: {sidecar_hits or 'nenhum'}, {self.last_rebuild_ms} ms)")
+    
+    def _reload(self, modified_files):
+        """Chamado pelo monitor da pasta de dados quando planilhas mudam."""
+        with self.rebuild_lock:
+            self._rebuild(modified_files)
+    
+    def _current(self):
+        """Retorna o snapshot publicado, fazendo a carga inicial se ainda não houver nenhum."""
+        snapshot = self.snapshot
+        if snapshot.loaded:
+            return snapshot
+        with self.rebuild_lock:
+            if not self.snapshot.loaded:
+                self.watcher.snapshot()
+                self._rebuild(self.files_to_check)
+            return self.snapshot
+    
+    def start(self):
+        """Carrega o cache e inicia o monitoramento da pasta de dados em segundo plano."""
+        self._current()
+        self.watcher.start()
     
     def get_alunos(self):
         """Retorna lista de alunos (com cache)."""
-        self._update_cache_if_needed()
-        return self.cache.get('alunos', [])
+        return self._current().alunos
     
     def get_clientes(self):
         """Retorna lista de clientes (com cache)."""
-        self._update_cache_if_needed()
-        return self.cache.get('clientes', [])
+        return self._current().clientes
     
     def get_lojas(self):
         """Retorna lista de lojas (com cache)."""
-        self._update_cache_if_needed()
-        return self.cache.get('lojas', [])
+        return self._current().lojas
     
     def get_produtos(self):
         """Retorna lista de produtos (com cache)."""
-        self._update_cache_if_needed()
-        return self.cache.get('produtos', [])
+        return self._current().produtos
+    
+    def get_encoded(self, name, encode):
+        """
+        Resposta pré-codificada do snapshot atual: encode(snapshot) roda uma vez por snapshot e
+        por nome; as chamadas seguintes reutilizam o resultado até a próxima recarga.
+        """
+        snapshot = self._current()
+        encoded = snapshot.encoded_bodies.get(name)
+        if encoded is None:
+            # Requisições simultâneas podem codificar juntas; o resultado é o mesmo
+            encoded = snapshot.encoded_bodies[name] = encode(snapshot)
+        return encoded
     
     def buscar_aluno(self, nome):
-        """Busca um aluno pelo nome."""
-        alunos = self.get_alunos()
-        for aluno in alunos:
+        """Busca um aluno pelo nome exato e, se não houver, pelo primeiro que contém o trecho informado."""
+        snapshot = self._current()
+        aluno = snapshot.alunos_por_nome.get(nome)
+        if aluno is not None:
+            return aluno
+        for aluno in snapshot.alunos:
             if nome.lower() in aluno['nome'].lower():
                 return aluno
         return None
     
     def buscar_cliente(self, nome):
-        """Busca um cliente pelo nome."""
-        clientes = self.get_clientes()
-        for cliente in clientes:
-            if cliente['nome'] == nome:
-                return cliente
-        return None
+        """Busca um cliente pelo nome exato."""
+        return self._current().clientes_por_nome.get(nome)
     
     def buscar_produto(self, nome):
-        """Busca um produto pelo nome."""
-        produtos = self.get_produtos()
-        for produto in produtos:
-            if produto['nome'] == nome:
-                return produto
-        return None
+        """Busca um produto pelo nome exato."""
+        return self._current().produtos_por_nome.get(nome)
     
-    def get_pedidos(self):
-        """Retorna dados de pedidos do arquivo Base_Vendas.xlsx."""
-        try:
-            self._check_and_update_cache()
-            return self.cache.get('pedidos', pd.DataFrame())
-        except Exception as e:
-            logger.error(f"Erro ao obter pedidos: {str(e)}")
-            if self.email_notifier:
-                self.email_notifier.notify_data_corruption('Base_Vendas.xlsx', str(e))
-            return pd.DataFrame()
+    def buscar_produto_por_codigo(self, codigo):
+        """Busca um produto pelo código."""
+        return self._current().produtos_por_codigo.get(codigo)
+    
+    def buscar_loja(self, nome):
+        """Busca uma loja pelo nome exato."""
+        return self._current().lojas_por_nome.get(nome)
+    
+    def sugerir(self, dataset, termo, limit=10):
+        """
+        Sugestões para autocompletar: registros do conjunto cujo nome (ou alguma palavra dele)
+        começa com o termo, sem diferenciar acentos e maiúsculas. None se o conjunto não existir.
+        """
+        index = self._current().sugestoes.get(dataset)
+        if index is None:
+            return None
+        return index.search(termo, limit)
     
     def force_refresh(self):
-        """Força a atualização do cache."""
-        with self.cache_lock:
-            self.last_check = None
-            self.file_timestamps.clear()
-            self.file_hashes.clear()
-            self.cache.clear()
-        self._update_cache_if_needed()
+        """Força o reprocessamento das planilhas (leitores seguem no snapshot anterior até a publicação)."""
+        with self.rebuild_lock:
+            self.watcher.snapshot()
+            self._rebuild(self.files_to_check, use_sidecar=False)
     
     def get_cache_info(self):
         """Retorna informações sobre o cache."""
+        snapshot = self.snapshot
         return {
-            'last_updated': self.cache.get('last_updated'),
-            'last_check': self.last_check.isoformat() if self.last_check else None,
+            'last_updated': snapshot.created_at.isoformat() if snapshot.created_at else None,
+            'snapshot_version': snapshot.version,
+            'snapshot_age_seconds': snapshot.age_seconds(),
             'cached_items': {
-                'alunos': len(self.cache.get('alunos', [])),
-                'clientes': len(self.cache.get('clientes', [])),
-                'lojas': len(self.cache.get('lojas', [])),
-                'produtos': len(self.cache.get('produtos', [])),
-                'pedidos': len(self.cache.get('pedidos', pd.DataFrame()))
+                'alunos': len(snapshot.alunos),
+                'clientes': len(snapshot.clientes),
+                'lojas': len(snapshot.lojas),
+                'produtos': len(snapshot.produtos)
             },
-            'check_interval_minutes': self.check_interval.total_seconds() / 60
+            'snapshot_persistente': self.sidecar_hits,
+            'relatorio_precos': self.reports.get('produtos'),
+            'leitura': {
+                'leitor': self.reader_engine,
+                'modo': self.last_load_mode,
+                'processos': self.parallel_workers,
+                'ultima_recarga_ms': self.last_rebuild_ms
+            },
+            'watcher': self.watcher.get_info()
         }
-
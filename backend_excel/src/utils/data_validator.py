@@ -7,6 +7,58 @@ import re
 import pandas as pd
 from typing import Dict, List, Any, Optional, Tuple
 
+# Padrões pré-compilados (usados na validação por linha e na validação por colunas)
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+NON_NUMERIC_PATTERN = re.compile(r'[^\d.-]')
+CPF_SEPARATORS = re.compile(r'[.\- ]')
+PHONE_SEPARATORS = re.compile(r'[()\- ]')
+CEP_SEPARATORS = re.compile(r'[\- ]')
+
+# Campos de cada tipo de dado para a validação por colunas, na ordem dos métodos validate_*_data:
+# (campo limpo, coluna de origem, regra, mensagem de erro). Regras:
+#   'obrigatorio'                     - texto; vazio gera erro e a linha é descartada
+#   'texto'                           - texto limpo, sem validação
+#   'email', 'cpf', 'telefone', 'cep' - texto; valor preenchido e inválido gera erro e vira ""
+#   'preco'                           - número >= 0; ausente ou inválido gera erro e vira 0.0
+VALIDATION_SPECS = {
+    'alunos': [
+        ('nome', 'Nome do Estudante', 'obrigatorio', "Nome do estudante é obrigatório"),
+        ('email', 'E-mail do Aluno', 'email', "Email inválido: {valor}"),
+        ('serie', 'Série do Aluno', 'texto', None),
+        ('numero', 'Número de Presença do Estudante', 'texto', None),
+        ('cep', 'Cep do Estudante', 'cep', "CEP inválido: {valor}"),
+        ('endereco', 'Rua/Av do Estudante', 'texto', None),
+        ('bairro', 'Bairro do Estudante', 'texto', None),
+        ('numero_endereco', 'Número Endereço do Estudante', 'texto', None),
+        ('cidade', 'Cidade do Estudante', 'texto', None),
+    ],
+    'clientes': [
+        ('nome', 'Nome', 'obrigatorio', "Nome do cliente é obrigatório"),
+        ('email', 'Email', 'email', "Email inválido: {valor}"),
+        ('cpf', 'CPF', 'cpf', "CPF inválido: {valor}"),
+        ('telefone', 'Telefone', 'telefone', "Telefone inválido: {valor}"),
+    ],
+    'produtos': [
+        ('nome', 'Nome', 'obrigatorio', "Nome do produto é obrigatório"),
+        ('codigo', 'Código', 'texto', None),
+        ('peso', 'Peso', 'texto', None),
+        ('preco', 'Preço', 'preco', "Preço inválido para produto {nome}"),
+    ],
+    'lojas': [
+        ('nome', 'Nome', 'obrigatorio', "Nome da loja é obrigatório"),
+        ('endereco', 'Endereço', 'texto', None),
+        ('telefone', 'Telefone', 'telefone', "Telefone inválido para loja {nome}: {valor}"),
+    ],
+}
+
+def _parse_float(value_str):
+    """float() do texto já limpo por clean_numeric (None se vazio ou inválido)."""
+    try:
+        return float(value_str) if value_str else None
+    except (ValueError, TypeError):
+        return None
+
 class DataValidator:
     """Classe para validação e limpeza de dados sujos."""
     
@@ -25,8 +77,7 @@ class DataValidator:
             return False
         
         email = str(email).strip()
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(pattern, email))
+        return bool(EMAIL_PATTERN.match(email))
     
     def validate_cpf(self, cpf: str) -> bool:
         """Valida formato de CPF (apenas números, 11 dígitos)."""
@@ -59,7 +110,7 @@ class DataValidator:
         
         value = str(value).strip()
         # Remove caracteres especiais desnecessários
-        value = re.sub(r'\s+', ' ', value)  # Múltiplos espaços -> um espaço
+        value = WHITESPACE_PATTERN.sub(' ', value)  # Múltiplos espaços -> um espaço
         return value
     
     def clean_numeric(self, value: Any) -> Optional[float]:
@@ -70,7 +121,7 @@ class DataValidator:
         try:
             # Remove caracteres não numéricos exceto ponto e vírgula
             value_str = str(value).replace(',', '.').strip()
-            value_str = re.sub(r'[^\d.-]', '', value_str)
+            value_str = NON_NUMERIC_PATTERN.sub('', value_str)
             return float(value_str) if value_str else None
         except (ValueError, TypeError):
             return None
@@ -205,11 +256,100 @@ class DataValidator:
         
         return cleaned_data, errors
     
-    def validate_dataframe(self, df: pd.DataFrame, data_type: str) -> Tuple[List[Dict], List[str]]:
-        """Valida um DataFrame completo baseado no tipo de dados."""
-        if df is None or df.empty:
-            return [], [f"DataFrame {data_type} está vazio ou nulo"]
+    def _per_unique(self, texts: pd.Series, transform) -> pd.Series:
+        """
+        Aplica uma operação vetorizada apenas aos valores distintos de uma coluna de textos
+        e expande o resultado (séries, cidades, CEPs etc. se repetem muito).
+        """
+        codes, uniques = pd.factorize(texts)
+        result = transform(pd.Series(uniques, dtype=object)).to_numpy()
+        return pd.Series(result[codes], index=texts.index)
+    
+    def clean_string_series(self, series: pd.Series) -> pd.Series:
+        """Versão por colunas de clean_string: str(), strip e espaços múltiplos -> um espaço ("" para vazios)."""
+        texts = series.astype(object).map(str, na_action='ignore').fillna('').astype(object)
+        return self._per_unique(texts, lambda u: u.str.strip().str.replace(WHITESPACE_PATTERN, ' ', regex=True))
+    
+    def clean_numeric_series(self, series: pd.Series) -> pd.Series:
+        """Versão por colunas de clean_numeric (None para vazios e inválidos)."""
+        texts = series.astype(object).map(str, na_action='ignore').fillna('').astype(object)
+        texts = texts.str.replace(',', '.', regex=False).str.strip().str.replace(NON_NUMERIC_PATTERN, '', regex=True)
+        return texts.map(_parse_float).astype(object)
+    
+    def _valid_mask(self, values: pd.Series, rule: str) -> pd.Series:
+        """Máscara de valores válidos para as regras de formato (valores já limpos)."""
+        if rule == 'email':
+            return values.str.match(EMAIL_PATTERN)
+        if rule == 'cpf':
+            digits = values.str.replace(CPF_SEPARATORS, '', regex=True)
+            return digits.str.isdigit() & (digits.str.len() == 11)
+        if rule == 'telefone':
+            digits = values.str.replace(PHONE_SEPARATORS, '', regex=True)
+            return digits.str.isdigit() & (digits.str.len() >= 10)
+        if rule == 'cep':
+            digits = values.str.replace(CEP_SEPARATORS, '', regex=True)
+            return digits.str.isdigit() & (digits.str.len() == 8)
+        raise ValueError(f"Regra de validação desconhecida: {rule}")
+    
+    def _validate_dataframe_columns(self, df: pd.DataFrame, spec: List[Tuple]) -> Tuple[List[Dict], List[str]]:
+        """
+        Validação por colunas: limpeza e checagens com operações vetorizadas do pandas.
+        Produz os mesmos registros e a mesma lista de erros por linha da validação linha a linha.
+        """
+        index = df.index
+        cleaned = {}
+        messages = {}
+        nome = None
+        
+        for field, column, rule, message in spec:
+            if rule == 'preco':
+                source = df[column] if column in df.columns else pd.Series(0, index=index, dtype=object)
+                values = self.clean_numeric_series(source)
+                invalid = values.isna() | (pd.to_numeric(values, errors='coerce') < 0)
+                values = values.where(~invalid, 0.0)
+            else:
+                source = df[column] if column in df.columns else pd.Series('', index=index, dtype=object)
+                values = self.clean_string_series(source)
+                if rule == 'obrigatorio':
+                    invalid = values == ''
+                elif rule == 'texto':
+                    invalid = None
+                else:
+                    valid = self._per_unique(values, lambda u: self._valid_mask(u, rule)).astype(bool)
+                    invalid = (values != '') & ~valid
+            
+            if invalid is not None and invalid.any():
+                # Mensagens montadas só para as linhas com erro
+                bad = invalid[invalid].index
+                nomes = nome[bad] if nome is not None else [''] * len(bad)
+                valores = values[bad] if rule != 'obrigatorio' else [''] * len(bad)
+                messages[field] = pd.Series(
+                    [message.format(valor=valor, nome=n) for valor, n in zip(valores, nomes)], index=bad)
+                if rule not in ('obrigatorio', 'preco'):
+                    values = values.where(~invalid, '')
+            
+            if rule == 'obrigatorio':
+                nome = values
+            cleaned[field] = values
+        
+        # Registros: só linhas com nome (campos válidos são mantidos mesmo com erros)
+        fields = list(cleaned)
+        keep = (nome != '').to_numpy() if nome is not None else slice(None)
+        columns = [cleaned[field].to_numpy()[keep] for field in fields]
+        validated_data = [dict(zip(fields, row)) for row in zip(*columns)]
+        
+        all_errors = []
+        if messages:
+            errors_df = pd.DataFrame(messages, index=index, columns=[f for f, *_ in spec if f in messages])
+            errors_df = errors_df[errors_df.notna().any(axis=1)]
+            for label, row in zip(errors_df.index, errors_df.itertuples(index=False)):
+                joined = '; '.join(m for m in row if isinstance(m, str))
+                all_errors.append(f"Linha {label + 2}: {joined}")
         
+        return validated_data, all_errors
+    
+    def _validate_dataframe_rows(self, df: pd.DataFrame, data_type: str) -> Tuple[List[Dict], List[str]]:
+        """Validação linha a linha com os métodos validate_*_data (referência e alternativa)."""
         validated_data = []
         all_errors = []
         
@@ -242,6 +382,26 @@ class DataValidator:
         
         return validated_data, all_errors
     
+    def validate_dataframe(self, df: pd.DataFrame, data_type: str, vectorized: bool = True) -> Tuple[List[Dict], List[str]]:
+        """
+        Valida um DataFrame completo baseado no tipo de dados.
+        Usa a validação por colunas; vectorized=False (ou uma falha inesperada) usa a validação linha a linha.
+        """
+        if df is None or df.empty:
+            return [], [f"DataFrame {data_type} está vazio ou nulo"]
+        
+        spec = VALIDATION_SPECS.get(data_type)
+        if spec is None:
+            return [], [f"Tipo de dados não suportado: {data_type}"]
+        
+        if vectorized:
+            try:
+                return self._validate_dataframe_columns(df, spec)
+            except Exception as e:
+                print(f"Validação por colunas falhou ({data_type}), usando validação por linha: {str(e)}")
+        
+        return self._validate_dataframe_rows(df, data_type)
+    
     def get_data_quality_report(self, data_type: str, total_rows: int, valid_rows: int, errors: List[str]) -> Dict:
         """Gera um relatório de qualidade dos dados."""
         return {
@@ -217,10 +217,16 @@ class EmailNotifier:
         error_summary = {}
         
         for error in validation_errors:
-            error_type = error.get('type', 'Desconhecido')
-            if error_type not in error_summary:
-                error_summary[error_type] = 0
-            error_summary[error_type] += 1
+            if isinstance(error, dict):
+                error_types = [error.get('type', 'Desconhecido')]
+            else:
+                # Mensagens do DataValidator: "Linha N: Email inválido: x; CEP inválido: y"
+                details = str(error).split(': ', 1)[-1] if str(error).startswith('Linha ') else str(error)
+                error_types = [part.split(':')[0].strip() for part in details.split('; ')]
+            for error_type in error_types:
+                if error_type not in error_summary:
+                    error_summary[error_type] = 0
+                error_summary[error_type] += 1
         
         formatted = []
         for error_type, count in error_summary.items():
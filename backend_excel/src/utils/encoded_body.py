@@ -0,0 +1,49 @@
+"""
+Corpos de resposta JSON pré-codificados.
+As listas do cache só mudam quando uma planilha muda: cada snapshot guarda o JSON já
+codificado (e comprimido), com uma ETag forte. Requisições repetidas viram
+uma cópia de bytes, ou um 304 sem corpo quando o navegador já tem a versão atual.
+"""
+
+import hashlib
+from flask import current_app, request
+from .json_response import COMPRESS_MIN_BYTES, compress, negotiate_encoding
+
+class EncodedBody:
+    __slots__ = ('body', 'compressed', 'etag')
+
+    def __init__(self, body):
+        self.body = body
+        self.compressed = {}  # Codificação ('br'/'gzip') -> bytes, comprimidos na primeira vez que forem pedidos
+        # Derivada do conteúdo: igual entre workers e reinícios enquanto os dados não mudarem
+        self.etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+
+    @classmethod
+    def from_data(cls, data):
+        """Codifica exatamente como o jsonify do app (uma vez por snapshot)."""
+        return cls(current_app.json.response(data).get_data())
+
+    def compressed_body(self, encoding):
+        """Corpo comprimido com a codificação pedida (calculado uma vez)."""
+        body = self.compressed.get(encoding)
+        if body is None:
+            body = self.compressed[encoding] = compress(self.body, encoding)
+        return body
+
+def encoded_response(encoded):
+    """Resposta para um corpo pré-codificado: 304 se o cliente já tem a ETag, comprimida se aceito."""
+    encoding = negotiate_encoding() if len(encoded.body) >= COMPRESS_MIN_BYTES else None
+    # Cada codificação tem bytes diferentes, então uma ETag forte própria
+    etag = encoded.etag if encoding is None else f'{encoded.etag}-{encoding}'
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    elif encoding is not None:
+        response = current_app.response_class(encoded.compressed_body(encoding), mimetype='application/json')
+        response.content_encoding = encoding
+    else:
+        response = current_app.response_class(encoded.body, mimetype='application/json')
+
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    response.cache_control.no_cache = True  # Sempre revalidar (If-None-Match) antes de reutilizar
+    return response
@@ -0,0 +1,84 @@
+"""
+Leitores de planilhas Excel.
+Permite escolher o mecanismo de leitura: openpyxl (padrão, em modo read_only) ou calamine
+(python-calamine, implementado em Rust e bem mais rápido) quando estiver instalado.
+Também oferece leitura linha a linha, sem montar um DataFrame intermediário.
+"""
+
+import openpyxl
+from .file_lock import FileLock, read_excel_shared
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:  # python-calamine é opcional
+    CalamineWorkbook = None
+
+READER_ENGINES = ('openpyxl', 'calamine')
+
+def resolve_engine(engine=None):
+    """Resolve o leitor a usar: 'auto' (ou vazio) escolhe calamine quando instalado, senão openpyxl."""
+    engine = (engine or 'auto').strip().lower()
+    if engine == 'auto':
+        return 'calamine' if CalamineWorkbook is not None else 'openpyxl'
+    if engine not in READER_ENGINES:
+        print(f"Leitor de Excel desconhecido '{engine}', usando openpyxl")
+        return 'openpyxl'
+    if engine == 'calamine' and CalamineWorkbook is None:
+        print("python-calamine não está instalado, usando openpyxl")
+        return 'openpyxl'
+    return engine
+
+def read_excel(filepath, engine='openpyxl', schema=None):
+    """Lê a primeira aba em um DataFrame com o leitor escolhido, aplicando o esquema (se houver)."""
+    options = schema.read_options() if schema is not None else {}
+    return read_excel_shared(filepath, engine=engine, **options)
+
+def _openpyxl_rows(filepath):
+    """Linhas da primeira aba via openpyxl em modo read_only (streaming do XML)."""
+    workbook = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+def _calamine_rows(filepath):
+    """Linhas da primeira aba via calamine (células vazias vêm como '')."""
+    sheet = CalamineWorkbook.from_path(filepath).get_sheet_by_index(0)
+    for values in sheet.iter_rows():
+        yield [None if value == '' else value for value in values]
+
+def iter_rows(filepath, engine='openpyxl', schema=None):
+    """
+    Percorre as linhas da primeira aba como dicionários {coluna: valor}, sem montar DataFrame.
+    A primeira linha é o cabeçalho e linhas vazias são ignoradas. Com esquema, só as colunas
+    declaradas são retornadas, já convertidas. A trava compartilhada do arquivo fica presa até
+    o fim da iteração.
+    """
+    rows_of = _calamine_rows if engine == 'calamine' else _openpyxl_rows
+    converters = schema.row_converters() if schema is not None else {}
+
+    with FileLock.for_file(filepath, shared=True):
+        rows = rows_of(filepath)
+        try:
+            header = next(rows, None)
+            if header is None:
+                return
+
+            columns = []
+            for index, name in enumerate(header):
+                if name is None:
+                    continue
+                name = str(name)
+                if schema is None or name in schema.columns:
+                    columns.append((index, name, converters.get(name)))
+
+            for values in rows:
+                if all(value is None for value in values):
+                    continue
+                record = {}
+                for index, name, convert in columns:
+                    value = values[index] if index < len(values) else None
+                    record[name] = convert(value) if convert is not None else value
+                yield record
+        finally:
+            rows.close()
@@ -0,0 +1,129 @@
+"""
+Registro de esquemas das planilhas Excel.
+Declara, por arquivo, as colunas que o sistema usa e como cada uma deve ser lida.
+A leitura passa apenas essas colunas (usecols), com tipos definidos (dtype/converters):
+colunas que não servimos nem chegam a ser convertidas, e campos com poucos valores
+distintos viram categorias, reduzindo tempo de leitura e memória a cada recarga.
+A estrutura de cada arquivo está documentada em ESTRUTURA_EXCEL.md.
+"""
+
+from .data_validator import DataValidator
+
+_validator = DataValidator()
+
+def _texto(value):
+    """Valor lido como texto, como faz dtype=str na leitura pelo pandas (25.0 -> '25')."""
+    if value is None:
+        return None
+    if isinstance(value, float):
+        if value != value:  # NaN
+            return None
+        if value.is_integer():
+            value = int(value)
+    return str(value)
+
+def _codigo(value):
+    """Código numérico ou textual lido como texto (CPF, telefone, CEP...): 12345678901.0 -> '12345678901'."""
+    value = _texto(value)
+    if value is None:
+        return None
+    return value.strip() or None
+
+def _numero(value):
+    """Valor numérico tolerante a formatação ('R$ 25,90' -> 25.9); None quando vazio ou inválido."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str) and not value.strip():
+        return None
+    return _validator.clean_numeric(value)
+
+# Tipos de coluna aceitos nos esquemas
+_DTYPES = {
+    'texto': str,
+    'categoria': 'category',  # Poucos valores distintos (série, cidade, UF...)
+}
+_CONVERTERS = {
+    'codigo': _codigo,
+    'numero': _numero,
+}
+# Leitura linha a linha (excel_reader.iter_rows): todo tipo vira um conversor
+_ROW_CONVERTERS = {
+    'texto': _texto,
+    'categoria': _texto,
+    'codigo': _codigo,
+    'numero': _numero,
+}
+
+class ExcelSchema:
+    """Colunas usadas de uma planilha e o tipo de cada uma ('texto', 'categoria', 'codigo', 'numero' ou None)."""
+
+    def __init__(self, columns):
+        self.columns = dict(columns)
+
+    def read_options(self):
+        """Argumentos para pandas.read_excel: projeção de colunas, dtypes e conversores."""
+        dtype = {}
+        converters = {}
+        for column, kind in self.columns.items():
+            if kind in _DTYPES:
+                dtype[column] = _DTYPES[kind]
+            elif kind in _CONVERTERS:
+                converters[column] = _CONVERTERS[kind]
+        # usecols como função: colunas ausentes na planilha não geram erro na leitura
+        return {
+            'usecols': lambda column: column in self.columns,
+            'dtype': dtype,
+            'converters': converters,
+        }
+
+    def row_converters(self):
+        """Conversor de cada coluna para a leitura linha a linha (None = valor sem conversão)."""
+        return {column: _ROW_CONVERTERS.get(kind) for column, kind in self.columns.items()}
+
+EXCEL_SCHEMAS = {
+    'B_Alunos.xlsx': ExcelSchema({
+        'Série do Aluno': 'categoria',
+        'Número de Presença do Estudante': 'codigo',
+        'Nome do Estudante': 'texto',
+        'E-mail do Aluno': 'texto',
+        'Cep do Estudante': 'codigo',
+        'Rua/Av do Estudante': 'texto',
+        'Bairro do Estudante': 'texto',
+        'Número Endereço do Estudante': 'codigo',
+        'Cidade do Estudante': 'categoria',
+    }),
+    'Base_cadastos.xlsx': ExcelSchema({
+        'Digite o nome completo do cliente': 'texto',
+        'Digite o e-mail do cliente:': 'texto',
+    }),
+    'Base Clientes.xlsx': ExcelSchema({
+        'Digite o nome completo do cliente': 'texto',
+        'CPF Cliente': 'codigo',
+        'Telefone Cliente': 'codigo',
+        'Endereço completo Cliente': 'texto',
+    }),
+    'B_Lojas.xlsx': ExcelSchema({
+        'COD': 'codigo',
+        'Nome oficial': 'texto',
+        'ENDEREÇO': 'texto',
+        'CEP': 'codigo',
+        'Região IM': 'categoria',
+        'NM_DIST': 'categoria',
+        'NM_MUN': 'categoria',
+        'NM_MESO': 'categoria',
+        'SIGLA_UF': 'categoria',
+        'Região_Geográfica': 'categoria',
+        'LAT': 'numero',
+        'LONG': 'numero',
+    }),
+    'Base_Produtos.xlsx': ExcelSchema({
+        'NomeProduto': 'texto',
+        '_CodigoReferenciaProduto': 'codigo',
+        'RANGE MAX_1': 'texto',
+    }),
+    'B_Precos.xlsx': ExcelSchema({
+        'Cod Produto': 'codigo',
+        'Preço Negócio - Atual': 'numero',
+    }),
+    # Base_Vendas.xlsx: esquema em order_store.VENDAS_SCHEMA (derivado dos nomes de coluna aceitos)
+}
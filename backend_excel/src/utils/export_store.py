@@ -0,0 +1,86 @@
+"""
+Exportações de pedidos para Excel, guardadas por um tempo para download.
+A planilha é gravada linha a linha com o modo write-only do openpyxl (memória constante, por
+maior que seja a exportação) em uma pasta própria; o navegador baixa o arquivo pelo token
+devolvido. Arquivos vencidos são apagados a cada nova exportação ou download.
+"""
+
+import os
+import re
+import time
+import uuid
+import tempfile
+from openpyxl import Workbook
+
+# Token das exportações: uuid4 em hexadecimal (também impede caminhos fora da pasta)
+TOKEN_RE = re.compile(r'^[0-9a-f]{32}$')
+
+class ExportStore:
+    def __init__(self, directory, ttl_seconds=3600):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+
+    def _path(self, token, filename):
+        return os.path.join(self.directory, f'{token}_{filename}')
+
+    def create(self, columns, rows, filename, sheet_title='Pedidos'):
+        """
+        Grava a planilha com o cabeçalho columns e as linhas do iterável rows.
+        Retorna (token, quantidade de linhas). O arquivo só aparece completo (grava em .tmp e renomeia).
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self.cleanup()
+
+        token = uuid.uuid4().hex
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=f'.{token}.', suffix='.tmp.xlsx')
+        os.close(fd)
+        try:
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet(sheet_title)
+            sheet.append(columns)
+            total = 0
+            for row in rows:
+                sheet.append(row)
+                total += 1
+            workbook.save(temp_path)
+            os.replace(temp_path, self._path(token, filename))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return token, total
+
+    def find(self, token):
+        """Retorna (caminho, nome do arquivo) da exportação, ou None se não existir ou já venceu."""
+        if not TOKEN_RE.match(token or ''):
+            return None
+        self.cleanup()
+        prefix = f'{token}_'
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return None
+        for name in names:
+            if name.startswith(prefix):
+                return os.path.join(self.directory, name), name[len(prefix):]
+        return None
+
+    def cleanup(self):
+        """Apaga exportações (e arquivos temporários abandonados) mais antigas que ttl_seconds."""
+        limite = time.time() - self.ttl_seconds
+        removidos = 0
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < limite:
+                    os.remove(entry.path)
+                    removidos += 1
+            except FileNotFoundError:
+                pass  # Já removido por outro worker
+            except OSError as e:
+                # Arquivo em uso (download em andamento no Windows): fica para a próxima limpeza
+                print(f"Não foi possível remover a exportação {entry.name}: {e}")
+        return removidos
@@ -0,0 +1,121 @@
+"""
+Trava consultiva entre processos e gravação atômica de planilhas.
+Permite rodar vários workers (ex.: gunicorn) sobre os mesmos arquivos Excel:
+gravações vão para um arquivo temporário e são publicadas com rename atômico,
+sob uma trava de arquivo respeitada por todos os processos.
+"""
+
+import os
+import time
+import tempfile
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+class FileLockTimeout(Exception):
+    """Não foi possível obter a trava dentro do tempo limite."""
+
+class FileLock:
+    """
+    Trava consultiva baseada em um arquivo <alvo>.lock.
+    Com fcntl a trava pode ser compartilhada (leitores) ou exclusiva (escritores);
+    no Windows (msvcrt) toda trava é exclusiva.
+    """
+
+    def __init__(self, lock_path, shared=False, timeout=60, poll_interval=0.05):
+        self.lock_path = lock_path
+        self.shared = shared
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.fd = None
+
+    @classmethod
+    def for_file(cls, filepath, shared=False, timeout=60):
+        """Cria a trava associada a um arquivo de dados."""
+        return cls(filepath + '.lock', shared=shared, timeout=timeout)
+
+    def _try_lock(self):
+        """Tenta obter a trava sem bloquear. Retorna True se conseguiu."""
+        try:
+            if fcntl is not None:
+                mode = fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX
+                fcntl.flock(self.fd, mode | fcntl.LOCK_NB)
+            else:
+                os.lseek(self.fd, 0, os.SEEK_SET)
+                msvcrt.locking(self.fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def acquire(self):
+        """Obtém a trava, esperando até o tempo limite."""
+        self.fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + self.timeout if self.timeout is not None else None
+
+        while not self._try_lock():
+            if deadline is not None and time.monotonic() >= deadline:
+                os.close(self.fd)
+                self.fd = None
+                raise FileLockTimeout(f"Tempo esgotado aguardando a trava {os.path.basename(self.lock_path)}")
+            time.sleep(self.poll_interval)
+
+    def release(self):
+        """Libera a trava."""
+        if self.fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self.fd, 0, os.SEEK_SET)
+                msvcrt.locking(self.fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+def fsync_directory(dirpath):
+    """Garante que o rename foi persistido no diretório (sem efeito no Windows)."""
+    if os.name == 'nt':
+        return
+    fd = os.open(dirpath, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def atomic_write_excel(df, filepath):
+    """
+    Grava um DataFrame em um arquivo temporário no mesmo diretório e o publica com rename atômico.
+    Leitores veem o arquivo antigo ou o novo, nunca um arquivo pela metade.
+    O chamador deve segurar a trava exclusiva do arquivo (FileLock.for_file).
+    """
+    dirpath = os.path.dirname(filepath)
+    fd, temp_path = tempfile.mkstemp(dir=dirpath, prefix=f'.{os.path.basename(filepath)}.', suffix='.tmp.xlsx')
+    os.close(fd)
+
+    try:
+        df.to_excel(temp_path, index=False)
+        with open(temp_path, 'rb+') as f:
+            os.fsync(f.fileno())
+        os.replace(temp_path, filepath)
+        fsync_directory(dirpath)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def read_excel_shared(filepath, **kwargs):
+    """Lê uma planilha segurando a trava compartilhada do arquivo."""
+    with FileLock.for_file(filepath, shared=True):
+        return pd.read_excel(filepath, **kwargs)
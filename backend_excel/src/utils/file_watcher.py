@@ -0,0 +1,134 @@
+"""
+Monitoramento da pasta de dados em segundo plano.
+Usa eventos do sistema de arquivos (inotify, via watchdog) quando disponível e
+verificação periódica (polling) como alternativa. Detecta quais planilhas mudaram
+e avisa o cache fora do caminho das requisições.
+"""
+
+import os
+import traceback
+from datetime import datetime
+from threading import Thread, Event
+from .email_notifier import email_notifier
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # watchdog é opcional
+    Observer = None
+    FileSystemEventHandler = object
+
+class _WakeOnChangeHandler(FileSystemEventHandler):
+    """Acorda o monitor quando um dos arquivos monitorados é criado, alterado ou substituído."""
+
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        paths = [getattr(event, 'src_path', ''), getattr(event, 'dest_path', '')]
+        if any(os.path.basename(os.fsdecode(p)) in self.watcher.filenames for p in paths if p):
+            self.watcher.wake_event.set()
+
+class DataDirWatcher:
+    def __init__(self, data_dir, filenames, on_change, poll_interval=2, rescan_interval=60, debounce=0.5):
+        self.data_dir = data_dir
+        self.filenames = set(filenames)
+        self.on_change = on_change              # Recebe a lista de arquivos modificados
+        self.poll_interval = poll_interval      # Segundos entre verificações no modo polling
+        self.rescan_interval = rescan_interval  # Verificação de segurança no modo inotify
+        self.debounce = debounce                # Espera o fim de uma rajada de eventos antes de recarregar
+        self.signatures = {}
+        self.wake_event = Event()
+        self.stop_event = Event()
+        self.observer = None
+        self.watch_thread = None
+        self.last_scan = None
+
+    @property
+    def mode(self):
+        return 'inotify' if self.observer is not None else 'polling'
+
+    def _signature(self, filename):
+        """Assinatura barata do arquivo: muda a cada gravação ou rename atômico."""
+        try:
+            st = os.stat(os.path.join(self.data_dir, filename))
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def snapshot(self):
+        """Registra o estado atual dos arquivos (linha de base para as próximas verificações)."""
+        self.signatures = {filename: self._signature(filename) for filename in self.filenames}
+        self.last_scan = datetime.now()
+
+    def scan(self):
+        """Compara o estado atual com o anterior e retorna os arquivos modificados."""
+        modified = []
+        for filename in sorted(self.filenames):
+            signature = self._signature(filename)
+            if signature != self.signatures.get(filename):
+                self.signatures[filename] = signature
+                if signature is not None:
+                    modified.append(filename)
+        self.last_scan = datetime.now()
+        return modified
+
+    def _watch_loop(self):
+        """Loop do monitor: espera eventos (ou o intervalo de polling) e avisa sobre mudanças."""
+        timeout = self.rescan_interval if self.observer is not None else self.poll_interval
+        while not self.stop_event.is_set():
+            if self.wake_event.wait(timeout):
+                # Agrupa os eventos de uma mesma gravação (temporário + rename)
+                while self.wake_event.wait(self.debounce):
+                    self.wake_event.clear()
+                    if self.stop_event.is_set():
+                        return
+            self.wake_event.clear()
+
+            modified = self.scan()
+            if not modified:
+                continue
+            try:
+                self.on_change(modified)
+            except Exception as e:
+                email_notifier.notify_system_error(f"Erro ao recarregar arquivos modificados: {str(e)}", traceback.format_exc())
+
+    def start(self):
+        """Inicia o monitoramento em segundo plano."""
+        if self.watch_thread is not None and self.watch_thread.is_alive():
+            return
+
+        self.stop_event.clear()
+        if Observer is not None:
+            try:
+                self.observer = Observer()
+                self.observer.schedule(_WakeOnChangeHandler(self), self.data_dir, recursive=False)
+                self.observer.daemon = True
+                self.observer.start()
+            except Exception as e:
+                print(f"Monitoramento por eventos indisponível, usando polling: {str(e)}")
+                self.observer = None
+
+        self.watch_thread = Thread(target=self._watch_loop, daemon=True, name='data-dir-watcher')
+        self.watch_thread.start()
+
+    def stop(self):
+        """Para o monitoramento."""
+        self.stop_event.set()
+        self.wake_event.set()
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join()
+            self.observer = None
+        if self.watch_thread is not None:
+            self.watch_thread.join()
+            self.watch_thread = None
+
+    def get_info(self):
+        """Retorna informações sobre o monitor."""
+        return {
+            'modo': self.mode,
+            'ativo': self.watch_thread is not None and self.watch_thread.is_alive(),
+            'ultima_verificacao': self.last_scan.isoformat() if self.last_scan else None,
+            'intervalo_polling_segundos': self.poll_interval
+        }
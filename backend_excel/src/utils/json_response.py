@@ -0,0 +1,117 @@
+"""
+Codificação JSON e compressão das respostas da API.
+Usa orjson quando instalado (bem mais rápido que o json da biblioteca padrão) e converte
+valores do numpy/pandas (np.int64, np.float64, Timestamp, NaT...) sem passos extras.
+Respostas grandes são comprimidas com brotli (se instalado) ou gzip, conforme o Accept-Encoding.
+"""
+
+import gzip
+import math
+from datetime import date, datetime
+import numpy as np
+import pandas as pd
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional
+    brotli = None
+
+# Abaixo disso a compressão não compensa
+COMPRESS_MIN_BYTES = 1024
+
+# Tipos de conteúdo que valem a pena comprimir
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript')
+
+def _default(value):
+    """Converte valores que o JSON não conhece (numpy, pandas, datas) em tipos nativos."""
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        value = value.item()
+        if isinstance(value, float) and not math.isfinite(value):
+            return None
+        if not isinstance(value, (datetime, date)):
+            return value
+    if isinstance(value, (datetime, date)):  # Inclui pd.Timestamp
+        return value.isoformat()
+    return DefaultJSONProvider.default(value)
+
+class ApiJSONProvider(DefaultJSONProvider):
+    """Provedor JSON do app: orjson quando disponível, json da biblioteca padrão caso contrário."""
+
+    default = staticmethod(_default)
+
+    # Mesma saída do provedor padrão: chaves ordenadas
+    orjson_options = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+    @property
+    def engine(self):
+        return 'orjson' if orjson is not None else 'json'
+
+    def dumps_bytes(self, obj):
+        """Codifica direto em bytes UTF-8 (sem passar por str com orjson)."""
+        if orjson is None:
+            return self.dumps(obj).encode('utf-8')
+        return orjson.dumps(obj, default=_default, option=self.orjson_options)
+
+    def dumps(self, obj, **kwargs):
+        # Opções específicas do json (indent, separators...) ficam com a biblioteca padrão
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self.orjson_options).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        # Em modo debug mantém a saída indentada do provedor padrão
+        if orjson is None or self._app.debug:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
+
+def compress(body, encoding):
+    """Comprime bytes com 'br' ou 'gzip'."""
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+def negotiate_encoding():
+    """Codificação aceita pelo cliente da requisição atual ('br', 'gzip' ou None)."""
+    if brotli is not None and request.accept_encodings['br']:
+        return 'br'
+    if request.accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+def compress_response(response):
+    """
+    after_request: comprime respostas acima de COMPRESS_MIN_BYTES quando o cliente aceita.
+    Respostas em streaming, arquivos enviados direto e corpos já comprimidos passam sem mudança.
+    """
+    if (response.status_code < 200 or response.status_code >= 300 or response.status_code == 204
+            or response.direct_passthrough or response.is_streamed or response.content_encoding
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+
+    response.set_data(compress(body, encoding))
+    response.content_encoding = encoding
+    # A ETag do corpo sem compressão não vale para os bytes comprimidos
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
@@ -0,0 +1,175 @@
+"""
+Diário (journal) append-only de pedidos.
+Cada pedido é gravado como uma linha JSON no diário, com fsync, antes de ser confirmado ao usuário.
+Em segundo plano, o diário é compactado: os pedidos são aplicados na base de pedidos e removidos do diário.
+"""
+
+import os
+import json
+import traceback
+from datetime import datetime
+from threading import Lock, Thread, Event
+from .email_notifier import email_notifier
+from .file_lock import FileLock
+
+class OrderJournal:
+    def __init__(self, data_dir, apply_records, journal_filename='Base_Vendas.journal', compact_interval=1):
+        self.data_dir = data_dir
+        self.apply_records = apply_records  # Aplica um lote de registros no destino; deve ser idempotente
+        self.journal_path = os.path.join(data_dir, journal_filename)
+        self.journal_file_lock = FileLock.for_file(self.journal_path)
+        self.compact_file_lock = FileLock.for_file(self.journal_path + '.compact')
+        self.compact_interval = compact_interval  # Segundos entre compactações
+        self.journal_lock = Lock()
+        self.compact_lock = Lock()
+        self.stop_event = Event()
+        self.wake_event = Event()
+        self.compactor_thread = None
+        self.last_compaction = None
+
+    def _write_all(self, fd, data):
+        """Grava todos os bytes no descritor (os.write pode gravar parcialmente)."""
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+
+    def append(self, record):
+        """Grava um pedido no diário. Só retorna depois que o registro está em disco (fsync)."""
+        self.append_many([record])
+
+    def append_many(self, records):
+        """Grava um lote de pedidos no diário com uma única gravação e um único fsync."""
+        if not records:
+            return
+        data = ''.join(json.dumps(r, ensure_ascii=False, default=str) + '\n' for r in records).encode('utf-8')
+        with self.journal_lock, self.journal_file_lock:
+            fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                self._write_all(fd, data)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _read_records(self):
+        """
+        Lê os registros completos do diário.
+        Retorna (registros, bytes_consumidos). Uma última linha sem quebra de linha é
+        uma gravação interrompida (queda do processo) e é ignorada.
+        """
+        if not os.path.exists(self.journal_path):
+            return [], 0
+
+        with open(self.journal_path, 'rb') as f:
+            data = f.read()
+
+        records = []
+        consumed = 0
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b'\n'):
+                break
+            consumed += len(line)
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError as e:
+                email_notifier.notify_data_corruption(os.path.basename(self.journal_path), str(e))
+        return records, consumed
+
+    def _discard_prefix(self, consumed):
+        """Remove do diário os bytes já aplicados, preservando gravações feitas durante a compactação."""
+        with self.journal_lock, self.journal_file_lock:
+            with open(self.journal_path, 'rb') as f:
+                f.seek(consumed)
+                remaining = f.read()
+
+            temp_path = self.journal_path + '.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(remaining)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.journal_path)
+
+    def _truncate_torn_tail(self):
+        """Descarta uma gravação interrompida no fim do diário, para que o próximo append comece em linha nova."""
+        if not os.path.exists(self.journal_path):
+            return
+        with self.journal_lock, self.journal_file_lock:
+            with open(self.journal_path, 'rb+') as f:
+                data = f.read()
+                if data and not data.endswith(b'\n'):
+                    f.truncate(data.rfind(b'\n') + 1)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+    def pending_count(self):
+        """Retorna a quantidade de pedidos no diário ainda não compactados."""
+        records, _ = self._read_records()
+        return len(records)
+
+    def compact(self):
+        """
+        Aplica os pedidos do diário no destino e trunca o diário.
+        O destino ignora pedidos já aplicados, o que torna a compactação idempotente
+        caso o processo caia entre a aplicação e o truncamento.
+        A trava de compactação serializa a compactação entre processos.
+        """
+        with self.compact_lock, self.compact_file_lock:
+            records, consumed = self._read_records()
+            if not consumed:
+                return 0
+
+            novos = self.apply_records(records)
+
+            self._discard_prefix(consumed)
+            self.last_compaction = datetime.now()
+            return novos
+
+    def request_compaction(self):
+        """Pede uma compactação imediata (ex.: logo após o commit de um lote)."""
+        self.wake_event.set()
+
+    def replay(self):
+        """Reaplica os pedidos que ficaram no diário (ex.: após uma queda do servidor)."""
+        try:
+            self._truncate_torn_tail()
+            return self.compact()
+        except Exception as e:
+            email_notifier.notify_system_error(f"Erro ao reaplicar diário de pedidos: {str(e)}", traceback.format_exc())
+            return 0
+
+    def _compactor_loop(self):
+        """Loop da thread de compactação em segundo plano."""
+        while not self.stop_event.is_set():
+            self.wake_event.wait(self.compact_interval)
+            self.wake_event.clear()
+            try:
+                self.compact()
+            except Exception as e:
+                email_notifier.notify_system_error(f"Erro ao compactar diário de pedidos: {str(e)}", traceback.format_exc())
+
+    def start(self):
+        """Reaplica o diário pendente e inicia a compactação em segundo plano."""
+        self.replay()
+        if self.compactor_thread is None or not self.compactor_thread.is_alive():
+            self.stop_event.clear()
+            self.compactor_thread = Thread(target=self._compactor_loop, daemon=True, name='order-journal-compactor')
+            self.compactor_thread.start()
+
+    def stop(self):
+        """Para a compactação em segundo plano e aplica o que restou no diário."""
+        self.stop_event.set()
+        self.wake_event.set()
+        if self.compactor_thread is not None:
+            self.compactor_thread.join()
+            self.compactor_thread = None
+        self.compact()
+
+    def get_info(self):
+        """Retorna informações sobre o diário."""
+        return {
+            'pendentes': self.pending_count(),
+            'ultima_compactacao': self.last_compaction.isoformat() if self.last_compaction else None,
+            'intervalo_compactacao_segundos': self.compact_interval
+        }
@@ -0,0 +1,77 @@
+"""
+Estatísticas dos pedidos mantidas de forma incremental.
+Guarda contagem e valor por dia; a cada consulta só os pedidos gravados desde a última
+(id maior que o último visto, pela chave primária) são somados. Totais saem prontos e as
+janelas de hoje/semana/mês somam apenas os dias, então a virada do dia não exige recálculo.
+"""
+
+from datetime import datetime, timedelta
+from threading import Lock
+from sqlalchemy import select
+from src.models.user import db
+from src.models.order import Order
+
+class OrderStats:
+    def __init__(self):
+        self.lock = Lock()
+        self.days = {}          # data (ou None para pedidos sem data) -> [quantidade, valor]
+        self.total = 0
+        self.valor_total = 0.0
+        self.ultimo = None      # Data do pedido mais recente
+        self.last_id = 0        # Maior pedido.id já somado
+
+    def _add(self, data_pedido, valor):
+        """Soma um pedido aos totais e ao dia dele."""
+        dia = data_pedido.date() if data_pedido is not None else None
+        bucket = self.days.setdefault(dia, [0, 0.0])
+        bucket[0] += 1
+        bucket[1] += valor
+        self.total += 1
+        self.valor_total += valor
+        if data_pedido is not None and (self.ultimo is None or data_pedido > self.ultimo):
+            self.ultimo = data_pedido
+
+    def refresh(self):
+        """
+        Soma os pedidos gravados desde a última atualização (de qualquer processo, pois lê da base).
+        Os ids só crescem: a base não apaga pedidos e o SQLite tem um único gravador por vez.
+        """
+        with self.lock:
+            rows = db.session.execute(
+                select(Order.id, Order.data_pedido, Order.valor_total)
+                .where(Order.id > self.last_id)
+                .order_by(Order.id)
+            ).all()
+            for order_id, data_pedido, valor in rows:
+                self._add(data_pedido, float(valor or 0.0))
+                self.last_id = order_id
+            return len(rows)
+
+    def _count_since(self, inicio):
+        """Pedidos com data a partir do dia inicio."""
+        return sum(quantidade for dia, (quantidade, _) in self.days.items() if dia is not None and dia >= inicio)
+
+    def summary(self, agora=None):
+        """Estatísticas do painel (mesmo formato de sempre) a partir dos totais por dia."""
+        with self.lock:
+            if not self.total:
+                return {
+                    'total_pedidos': 0,
+                    'valor_total': 0,
+                    'pedidos_hoje': 0,
+                    'pedidos_semana': 0,
+                    'pedidos_mes': 0
+                }
+
+            hoje = (agora or datetime.now()).date()
+            inicio_semana = hoje - timedelta(days=hoje.weekday())
+            inicio_mes = hoje.replace(day=1)
+
+            return {
+                'total_pedidos': self.total,
+                'valor_total': float(self.valor_total),
+                'pedidos_hoje': self.days.get(hoje, [0])[0],
+                'pedidos_semana': self._count_since(inicio_semana),
+                'pedidos_mes': self._count_since(inicio_mes),
+                'ultimo_pedido': self.ultimo.strftime('%d/%m/%Y %H:%M') if self.ultimo else 'Nenhum'
+            }
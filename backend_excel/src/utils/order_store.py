@@ -0,0 +1,432 @@
+"""
+Base de pedidos em SQLite (Flask-SQLAlchemy).
+Pesquisas e estatísticas usam os índices da tabela de pedidos; Base_Vendas.xlsx
+passa a ser apenas um formato de importação (carga inicial) e de exportação.
+A pesquisa por trecho de nome ou de ID usa um índice invertido de trigramas (FTS5)
+mantido junto com os pedidos, em vez de percorrer a tabela inteira com LIKE.
+"""
+
+import os
+import json
+import pandas as pd
+from contextlib import nullcontext
+from flask import has_app_context
+from sqlalchemy import select, func, text, table, column, literal_column, or_, and_
+from sqlalchemy.exc import OperationalError
+from src.models.user import db
+from src.models.order import Order, OrderItem
+from .data_validator import DataValidator
+from .file_lock import FileLock, atomic_write_excel
+from .excel_reader import iter_rows, resolve_engine
+from .excel_schema import ExcelSchema
+from .prefix_index import normalize_text
+from .order_stats import OrderStats
+from .email_notifier import email_notifier
+
+# Colunas de Base_Vendas.xlsx -> campos do modelo Order.
+# A planilha já foi gravada com dois padrões de nomes; o primeiro de cada lista é o usado na exportação.
+VENDAS_COLUMNS = {
+    'id_pedido': ['ID_Pedido'],
+    'data_pedido': ['Data_Pedido', 'Data'],
+    'aluno_sala': ['Sala_Aluno', 'Aluno_Sala'],
+    'aluno_nome': ['Nome_Aluno', 'Aluno_Nome'],
+    'aluno_email': ['Email_Aluno', 'Aluno_Email'],
+    'cliente_nome': ['Nome_Cliente', 'Cliente_Nome'],
+    'cliente_email': ['Email_Cliente', 'Cliente_Email'],
+    'cliente_cpf': ['CPF_Cliente', 'Cliente_CPF'],
+    'cliente_telefone': ['Telefone_Cliente', 'Cliente_Telefone'],
+    'tipo_entrega': ['Tipo_Entrega'],
+    'loja_retirada': ['Loja_Retirada'],
+    'endereco_loja_retirada': ['Endereco_Loja_Retirada'],
+    'endereco_entrega': ['Endereco_Completo', 'Endereco_Entrega'],
+    'data_entrega': ['Data_Entrega'],
+    'condicao_entrega': ['Condicao_Entrega'],
+    'forma_pagamento': ['Forma_Pagamento'],
+    'itens_json': ['Itens_JSON', 'Itens'],
+    'valor_total': ['Valor_Total'],
+    'observacoes': ['Observacoes']
+}
+
+# Tipo de leitura de cada campo (ver excel_schema); campos ausentes são lidos como texto.
+# Datas ficam sem conversão: _parse_datetime aceita os formatos já gravados na planilha.
+VENDAS_TYPES = {
+    'id_pedido': 'codigo',
+    'data_pedido': None,
+    'cliente_cpf': 'codigo',
+    'cliente_telefone': 'codigo',
+    'tipo_entrega': 'categoria',
+    'loja_retirada': 'categoria',
+    'data_entrega': None,
+    'condicao_entrega': 'categoria',
+    'forma_pagamento': 'categoria',
+    'valor_total': 'numero'
+}
+
+VENDAS_SCHEMA = ExcelSchema({
+    column: VENDAS_TYPES.get(field, 'texto')
+    for field, columns in VENDAS_COLUMNS.items()
+    for column in columns
+})
+
+# Limite de variáveis por consulta do SQLite
+SQLITE_CHUNK = 500
+
+# Pedidos por transação na importação de planilhas
+IMPORT_BATCH = 1000
+
+# Índice de trigramas da pesquisa (tabela virtual FTS5, rowid = pedido.id).
+# Guarda os textos normalizados (sem acentos/maiúsculas) de cada campo pesquisável.
+SEARCH_FIELDS = {
+    'aluno': 'aluno_nome',
+    'cliente': 'cliente_nome',
+    'id_pedido': 'id_pedido'
+}
+pedido_busca = table('pedido_busca', column('rowid'), *(column(name) for name in SEARCH_FIELDS))
+
+# Termos mais curtos que um trigrama não usam o índice (o filtro percorre a tabela de busca)
+TRIGRAM = 3
+
+def _clean_text(value):
+    """Converte um valor de planilha/JSON em texto (None para vazios e NaN)."""
+    if value is None:
+        return None
+    if isinstance(value, float) and pd.isna(value):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # CPF/telefone lidos como número pelo Excel
+    value = str(value).strip()
+    return value or None
+
+def _parse_datetime(value):
+    """Converte a data do pedido para datetime (None se inválida)."""
+    if value is None or value == '':
+        return None
+    parsed = pd.to_datetime(value, errors='coerce')
+    if pd.isna(parsed):
+        return None
+    return parsed.to_pydatetime()
+
+class OrderStore:
+    def __init__(self, data_dir, legacy_filename='Base_Vendas.xlsx', reader_engine=None):
+        self.data_dir = data_dir
+        self.reader_engine = resolve_engine(reader_engine)
+        self.legacy_filename = legacy_filename
+        self.legacy_path = os.path.join(data_dir, legacy_filename)
+        self.validator = DataValidator()
+        self.app = None
+        self.search_index = False  # Índice de trigramas disponível (SQLite com FTS5)
+        self.order_stats = OrderStats()  # Contagem e valor por dia, atualizados a cada pedido gravado
+
+    def init_app(self, app):
+        """Associa a base ao app Flask e faz a importação única de Base_Vendas.xlsx se a base estiver vazia."""
+        self.app = app
+        with app.app_context():
+            # WAL: leitores não bloqueiam o gravador (vários workers na mesma base)
+            db.session.execute(text('PRAGMA journal_mode=WAL'))
+            db.session.commit()
+            self._init_search_index()
+            self.order_stats.refresh()
+
+            with FileLock.for_file(self.legacy_path + '.import'):
+                if self.count() == 0 and os.path.exists(self.legacy_path):
+                    importados = self.import_excel()
+                    print(f"Importação inicial: {importados} pedido(s) de {self.legacy_filename}")
+
+    def _init_search_index(self):
+        """Cria o índice de trigramas, se preciso, e indexa os pedidos que ainda não estão nele."""
+        try:
+            db.session.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS pedido_busca USING fts5({', '.join(SEARCH_FIELDS)}, tokenize='trigram')"
+            ))
+            db.session.commit()
+        except OperationalError as e:
+            db.session.rollback()
+            print(f"Índice de trigramas indisponível, pesquisa por LIKE: {str(e)}")
+            self.search_index = False
+            return
+        self.search_index = True
+
+        # Bases criadas antes do índice (ou gravadas por uma versão sem ele)
+        pendentes = db.session.execute(
+            select(Order.id, *(getattr(Order, field) for field in SEARCH_FIELDS.values()))
+            .where(Order.id.not_in(select(pedido_busca.c.rowid)))
+        ).all()
+        for start in range(0, len(pendentes), IMPORT_BATCH):
+            self._index_rows(pendentes[start:start + IMPORT_BATCH])
+        if pendentes:
+            db.session.commit()
+            print(f"Índice de pesquisa: {len(pendentes)} pedido(s) indexados")
+
+    def _index_rows(self, rows):
+        """Insere no índice de trigramas linhas (id, aluno_nome, cliente_nome, id_pedido)."""
+        if rows:
+            db.session.execute(pedido_busca.insert(), [
+                {'rowid': row[0], **{name: normalize_text(value) for name, value in zip(SEARCH_FIELDS, row[1:])}}
+                for row in rows
+            ])
+
+    def _app_context(self):
+        """Contexto de app para uso fora de requisições (threads de segundo plano, CLI)."""
+        return nullcontext() if has_app_context() or self.app is None else self.app.app_context()
+
+    def _value(self, record, field):
+        """Lê um campo do registro aceitando os nomes de coluna conhecidos."""
+        for column in VENDAS_COLUMNS[field]:
+            if column in record:
+                return record[column]
+        return None
+
+    def _parse_items(self, itens_json):
+        """
+        Decodifica os itens do pedido em linhas de OrderItem (uma única vez, na gravação).
+        Retorna (linhas, erro): erro descreve o problema de um itens_json inválido, ou None.
+        """
+        if itens_json is None:
+            return [], None
+        if isinstance(itens_json, str):
+            try:
+                itens = json.loads(itens_json)
+            except ValueError:
+                return [], 'Itens_JSON não é um JSON válido'
+        else:
+            itens = itens_json
+        if not isinstance(itens, list):
+            return [], 'Itens_JSON não é uma lista de itens'
+
+        rows = []
+        ignorados = 0
+        for index, item in enumerate(itens):
+            if not isinstance(item, dict):
+                ignorados += 1
+                continue
+            rows.append(OrderItem(
+                numero=item.get('numero', index + 1),
+                produto=_clean_text(item.get('produto', item.get('nome'))),
+                codigo=_clean_text(item.get('codigo')),
+                quantidade=self.validator.clean_numeric(item.get('quantidade')) or 0.0,
+                preco_unitario=self.validator.clean_numeric(item.get('precoUnitario', item.get('preco'))),
+                valor_total=self.validator.clean_numeric(item.get('valorTotal', item.get('total')))
+            ))
+        return rows, (f'{ignorados} item(ns) ignorado(s) em Itens_JSON' if ignorados else None)
+
+    def _order_from_record(self, record):
+        """Cria um Order a partir de um registro no formato de Base_Vendas.xlsx (diário ou planilha)."""
+        itens_json = self._value(record, 'itens_json')
+        if itens_json is not None and not isinstance(itens_json, str):
+            itens_json = json.dumps(itens_json, ensure_ascii=False)
+        itens_json = _clean_text(itens_json)
+
+        order = Order(
+            id_pedido=_clean_text(self._value(record, 'id_pedido')),
+            data_pedido=_parse_datetime(self._value(record, 'data_pedido')),
+            valor_total=self.validator.clean_numeric(self._value(record, 'valor_total')) or 0.0,
+            itens_json=itens_json
+        )
+        for field in VENDAS_COLUMNS:
+            if field not in ('id_pedido', 'data_pedido', 'valor_total', 'itens_json'):
+                setattr(order, field, _clean_text(self._value(record, field)))
+        order.aluno_nome_busca = order.aluno_nome.casefold() if order.aluno_nome else None
+        order.cliente_nome_busca = order.cliente_nome.casefold() if order.cliente_nome else None
+        order.itens, order.itens_erro = self._parse_items(itens_json)
+        return order
+
+    def apply_orders(self, records):
+        """
+        Insere pedidos na base em uma única transação.
+        Pedidos com ID_Pedido já existente são ignorados (reaplicar o diário é idempotente).
+        Retorna a quantidade de pedidos inseridos.
+        """
+        with self._app_context():
+            novos = {}
+            for record in records:
+                id_pedido = _clean_text(self._value(record, 'id_pedido'))
+                if id_pedido and id_pedido not in novos:
+                    novos[id_pedido] = record
+
+            ids = list(novos)
+            for start in range(0, len(ids), SQLITE_CHUNK):
+                chunk = ids[start:start + SQLITE_CHUNK]
+                existentes = db.session.scalars(select(Order.id_pedido).where(Order.id_pedido.in_(chunk)))
+                for id_pedido in existentes:
+                    novos.pop(id_pedido, None)
+
+            orders = [self._order_from_record(record) for record in novos.values()]
+            db.session.add_all(orders)
+            if self.search_index and orders:
+                db.session.flush()  # Gera os ids usados como rowid no índice (mesma transação)
+                self._index_rows([
+                    (order.id, *(getattr(order, field) for field in SEARCH_FIELDS.values())) for order in orders
+                ])
+            db.session.commit()
+            if orders:
+                self.order_stats.refresh()
+
+            # Itens inválidos são avisados uma vez, quando o pedido entra na base
+            erros = [f'Pedido {order.id_pedido}: {order.itens_erro}' for order in orders if order.itens_erro]
+            if erros:
+                print(f"{len(erros)} pedido(s) com itens inválidos")
+                email_notifier.notify_validation_errors('Itens_JSON (pedidos)', erros)
+            return len(novos)
+
+    def import_excel(self, filepath=None):
+        """
+        Importa os pedidos de uma planilha no formato de Base_Vendas.xlsx.
+        As linhas são lidas uma a uma (sem DataFrame) e gravadas em lotes de IMPORT_BATCH.
+        """
+        filepath = filepath or self.legacy_path
+        importados = 0
+        batch = []
+        for record in iter_rows(filepath, self.reader_engine, VENDAS_SCHEMA):
+            batch.append(record)
+            if len(batch) >= IMPORT_BATCH:
+                importados += self.apply_orders(batch)
+                batch = []
+        if batch:
+            importados += self.apply_orders(batch)
+        return importados
+
+    def count(self):
+        """Retorna o total de pedidos na base."""
+        return db.session.scalar(select(func.count(Order.id)))
+
+    def _search_subquery(self, termos):
+        """
+        Ids dos pedidos cujos campos contêm os trechos informados ({campo de SEARCH_FIELDS: trecho}).
+        Trechos com ao menos um trigrama viram uma consulta MATCH (interseção das listas de
+        ocorrências do índice); os mais curtos são filtrados por LIKE na tabela de busca.
+        """
+        frases = []
+        curtos = []
+        for campo, termo in termos.items():
+            termo = normalize_text(termo)
+            if not termo:
+                continue
+            if len(termo) >= TRIGRAM:
+                frases.append(f'{campo} : "{termo.replace(chr(34), chr(34) * 2)}"')
+            else:
+                curtos.append(pedido_busca.c[campo].contains(termo, autoescape=True))
+        if not frases and not curtos:
+            return None
+
+        subquery = select(pedido_busca.c.rowid).where(*curtos)
+        if frases:
+            subquery = subquery.where(literal_column('pedido_busca').match(' AND '.join(frases)))
+        return subquery
+
+    def _filtered_query(self, nome_aluno='', id_pedido='', data_inicio='', data_fim='', nome_cliente=''):
+        """Monta a consulta de pedidos com os filtros da pesquisa."""
+        query = select(Order)
+
+        # Busca parcial por nome do aluno, nome do cliente e ID, sem diferenciar acentos e maiúsculas
+        if self.search_index:
+            ids = self._search_subquery({'aluno': nome_aluno, 'cliente': nome_cliente, 'id_pedido': id_pedido})
+            if ids is not None:
+                query = query.where(Order.id.in_(ids))
+        else:
+            # Sem FTS5: LIKE sobre a tabela inteira (o LIKE do SQLite só ignora caixa em ASCII)
+            if nome_aluno:
+                query = query.where(Order.aluno_nome_busca.contains(nome_aluno.casefold(), autoescape=True))
+            if nome_cliente:
+                query = query.where(Order.cliente_nome_busca.contains(nome_cliente.casefold(), autoescape=True))
+            if id_pedido:
+                query = query.where(Order.id_pedido.icontains(id_pedido, autoescape=True))
+
+        # Filtros de data usam o índice de data_pedido
+        if data_inicio:
+            data_inicio_dt = pd.to_datetime(data_inicio, errors='coerce')
+            if not pd.isna(data_inicio_dt):
+                query = query.where(Order.data_pedido >= data_inicio_dt.to_pydatetime())
+
+        if data_fim:
+            data_fim_dt = pd.to_datetime(data_fim, errors='coerce')
+            if not pd.isna(data_fim_dt):
+                # Incluir todo o dia final
+                query = query.where(Order.data_pedido < (data_fim_dt + pd.Timedelta(days=1)).to_pydatetime())
+
+        return query
+
+    def search(self, nome_aluno='', id_pedido='', data_inicio='', data_fim='', nome_cliente='', limit=None, after=None):
+        """
+        Pesquisa pedidos; resultados do mais recente para o mais antigo.
+        Com limit, retorna no máximo limit pedidos a partir da posição after = (data_pedido, id)
+        do último pedido da página anterior (paginação por chave, estável com pedidos novos).
+        """
+        query = self._filtered_query(nome_aluno, id_pedido, data_inicio, data_fim, nome_cliente)
+        if after is not None:
+            data, order_id = after
+            if data is None:
+                # Pedidos sem data ficam no fim (NULL é o menor valor no SQLite)
+                query = query.where(Order.data_pedido.is_(None), Order.id < order_id)
+            else:
+                query = query.where(or_(
+                    Order.data_pedido < data,
+                    and_(Order.data_pedido == data, Order.id < order_id),
+                    Order.data_pedido.is_(None)
+                ))
+        # O índice de data_pedido termina no rowid (id): filtros de período viram uma faixa do
+        # índice, percorrida de trás para frente, sem ordenação extra
+        query = query.order_by(Order.data_pedido.desc(), Order.id.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        return db.session.scalars(query).all()
+
+    def iter_search(self, nome_aluno='', id_pedido='', data_inicio='', data_fim='', nome_cliente='', batch_size=500):
+        """
+        Percorre a pesquisa inteira em lotes de batch_size pedidos (mesma ordem de search).
+        Cada lote é uma consulta por chave a partir do último pedido do lote anterior, então só
+        um lote fica em memória, por maior que seja o resultado.
+        """
+        after = None
+        while True:
+            lote = self.search(nome_aluno, id_pedido, data_inicio, data_fim, nome_cliente,
+                               limit=batch_size, after=after)
+            yield from lote
+            if len(lote) < batch_size:
+                return
+            ultimo = lote[-1]
+            after = (ultimo.data_pedido, ultimo.id)
+            # Libera os pedidos já entregues (a sessão só guarda referências fracas)
+            del lote, ultimo
+
+    def count_search(self, nome_aluno='', id_pedido='', data_inicio='', data_fim='', nome_cliente=''):
+        """Total de pedidos da pesquisa (para a primeira página)."""
+        query = self._filtered_query(nome_aluno, id_pedido, data_inicio, data_fim, nome_cliente)
+        return db.session.scalar(select(func.count()).select_from(query.subquery()))
+
+    def list_orders(self, limit=None, after_id=None):
+        """Retorna os pedidos na ordem em que foram gravados (com limit, os seguintes a after_id)."""
+        query = select(Order).order_by(Order.id)
+        if after_id is not None:
+            query = query.where(Order.id > after_id)
+        if limit is not None:
+            query = query.limit(limit)
+        return db.session.scalars(query).all()
+
+    def stats(self):
+        """Estatísticas do painel, somando à agregação por dia só os pedidos novos."""
+        self.order_stats.refresh()
+        return self.order_stats.summary()
+
+    def to_record(self, order):
+        """Converte um Order para uma linha no formato de Base_Vendas.xlsx."""
+        record = {}
+        for field, columns in VENDAS_COLUMNS.items():
+            value = getattr(order, field)
+            if field == 'data_pedido' and value is not None:
+                value = value.strftime('%Y-%m-%d %H:%M:%S')
+            record[columns[0]] = value if value is not None else ''
+        return record
+
+    def to_dataframe(self, orders):
+        """Monta um DataFrame no formato de Base_Vendas.xlsx."""
+        columns = [columns[0] for columns in VENDAS_COLUMNS.values()]
+        return pd.DataFrame([self.to_record(order) for order in orders], columns=columns)
+
+    def export_excel(self, filepath=None):
+        """Exporta a base completa de pedidos para uma planilha (por padrão, Base_Vendas.xlsx)."""
+        filepath = filepath or self.legacy_path
+        with self._app_context():
+            df = self.to_dataframe(self.list_orders())
+        with FileLock.for_file(filepath):
+            atomic_write_excel(df, filepath)
+        return len(df)
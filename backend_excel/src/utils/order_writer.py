@@ -0,0 +1,88 @@
+"""
+Gravador de pedidos com commit em grupo (group commit).
+Uma única thread retira pedidos de uma fila e os grava no diário em lotes,
+com um fsync por lote. Cada requisição HTTP espera apenas a confirmação do seu lote.
+"""
+
+import time
+import traceback
+from queue import Queue, Empty
+from threading import Thread
+from concurrent.futures import Future
+from .email_notifier import email_notifier
+
+class GroupCommitWriter:
+    def __init__(self, journal, max_batch_size=64, max_latency=0.005):
+        self.journal = journal
+        self.max_batch_size = max_batch_size  # Máximo de pedidos por lote
+        self.max_latency = max_latency        # Segundos que o primeiro pedido do lote pode esperar por outros
+        self.queue = Queue()
+        self.writer_thread = None
+        self.batches_committed = 0
+        self.records_committed = 0
+
+    def submit(self, record):
+        """Enfileira um pedido e retorna um Future resolvido quando o lote for gravado."""
+        future = Future()
+        self.queue.put((record, future))
+        return future
+
+    def write(self, record, timeout=30):
+        """
+        Enfileira um pedido e espera a confirmação do commit do seu lote.
+        Se o tempo acabar (concurrent.futures.TimeoutError), o pedido continua na fila e ainda será gravado.
+        """
+        return self.submit(record).result(timeout=timeout)
+
+    def _collect_batch(self):
+        """Aguarda o primeiro pedido e junta os que chegarem até o limite de tamanho ou latência."""
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.max_latency
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self.queue.get(timeout=remaining))
+                else:
+                    batch.append(self.queue.get_nowait())
+            except Empty:
+                break
+        return batch
+
+    def _writer_loop(self):
+        """Loop da thread gravadora."""
+        while True:
+            batch = self._collect_batch()
+            records = [record for record, _ in batch]
+
+            try:
+                self.journal.append_many(records)
+            except Exception as e:
+                email_notifier.notify_system_error(f"Erro ao gravar lote de pedidos: {str(e)}", traceback.format_exc())
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches_committed += 1
+            self.records_committed += len(records)
+            for record, future in batch:
+                future.set_result(record)
+
+            self.journal.request_compaction()
+
+    def start(self):
+        """Inicia a thread gravadora."""
+        if self.writer_thread is None or not self.writer_thread.is_alive():
+            self.writer_thread = Thread(target=self._writer_loop, daemon=True, name='order-group-commit-writer')
+            self.writer_thread.start()
+
+    def get_info(self):
+        """Retorna informações sobre o gravador."""
+        return {
+            'fila': self.queue.qsize(),
+            'lotes_gravados': self.batches_committed,
+            'pedidos_gravados': self.records_committed,
+            'tamanho_maximo_lote': self.max_batch_size,
+            'latencia_maxima_ms': self.max_latency * 1000
+        }
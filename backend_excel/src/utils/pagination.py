@@ -0,0 +1,65 @@
+"""
+Paginação por cursor das listas da API.
+A página é pedida com ?limit=N; a resposta continua sendo uma lista JSON e o cursor da
+próxima página vai nos cabeçalhos X-Proximo-Cursor e Link (rel="next"). O cursor é opaco
+para o cliente: guarda a posição (chave da última linha ou posição no snapshot do cache)
+e não muda de sentido quando novos pedidos chegam.
+"""
+
+import base64
+import binascii
+import json
+from urllib.parse import urlencode
+from flask import request
+
+class CursorError(ValueError):
+    """Parâmetros de paginação inválidos ou cursor de outra versão dos dados."""
+
+def encode_cursor(state):
+    """Estado da paginação -> texto opaco seguro para URL."""
+    raw = json.dumps(state, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(token):
+    """Texto opaco -> estado da paginação (CursorError se não for um cursor nosso)."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        state = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise CursorError('Cursor inválido') from None
+    if not isinstance(state, dict):
+        raise CursorError('Cursor inválido')
+    return state
+
+def page_args(default_limit, max_limit):
+    """
+    Lê limit e cursor da requisição. Retorna (limit, estado do cursor); (None, None) quando
+    a requisição não pede paginação (resposta completa, como antes).
+    """
+    token = request.args.get('cursor', '').strip()
+    limit = request.args.get('limit', '').strip()
+    if not limit and not token:
+        return None, None
+    try:
+        limit = int(limit) if limit else default_limit
+    except ValueError:
+        raise CursorError('limit deve ser um número inteiro') from None
+    return min(max(limit, 1), max_limit), (decode_cursor(token) if token else None)
+
+def cursor_int(state, key):
+    """Inteiro guardado no cursor (CursorError se faltar ou tiver outro tipo)."""
+    value = state.get(key)
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise CursorError('Cursor inválido')
+    return value
+
+def add_next_cursor(response, state):
+    """Acrescenta os cabeçalhos da próxima página (nada se esta for a última)."""
+    if state is None:
+        return response
+    token = encode_cursor(state)
+    args = request.args.to_dict()
+    args['cursor'] = token
+    response.headers['X-Proximo-Cursor'] = token
+    response.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+    return response
@@ -0,0 +1,75 @@
+"""
+Índice de prefixos para sugestões (autocompletar) dos comboboxes.
+Os nomes são normalizados sem acentos e sem diferença entre maiúsculas e minúsculas,
+ordenados uma vez por recarga do cache e consultados por busca binária (bisect):
+cada sugestão custa O(log n + limite), sem percorrer a lista inteira.
+"""
+
+import unicodedata
+from bisect import bisect_left
+
+def normalize_text(value):
+    """Texto para comparação: sem acentos, em minúsculas e com espaços simples ('  JOÃO  Silva' -> 'joao silva')."""
+    if value is None:
+        return ''
+    value = str(value)
+    if value.isascii():  # Caso comum: nada a decompor
+        return ' '.join(value.lower().split())
+    decomposed = unicodedata.normalize('NFKD', value)
+    without_accents = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(without_accents.casefold().split())
+
+class PrefixIndex:
+    """
+    Índice ordenado de um campo textual de uma lista de registros.
+    Além do texto completo, indexa o início de cada palavra, para que 'silva' encontre
+    'Maria Silva'; correspondências no início do texto vêm primeiro.
+    """
+
+    def __init__(self, records, key):
+        self.records = records
+        full_keys, full_positions = [], []
+        word_keys, word_positions = [], []
+        for position, record in enumerate(records):
+            normalized = normalize_text(record.get(key))
+            if not normalized:
+                continue
+            full_keys.append(normalized)
+            full_positions.append(position)
+            start = normalized.find(' ')
+            while start != -1:
+                word_keys.append(normalized[start + 1:])
+                word_positions.append(position)
+                start = normalized.find(' ', start + 1)
+        self.full_keys, self.full_positions = self._sorted(full_keys, full_positions)
+        self.word_keys, self.word_positions = self._sorted(word_keys, word_positions)
+
+    @staticmethod
+    def _sorted(keys, positions):
+        """Ordena os textos (e as posições junto), comparando só as strings."""
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        return [keys[i] for i in order], [positions[i] for i in order]
+
+    def __len__(self):
+        return len(self.full_keys)
+
+    @staticmethod
+    def _matches(keys, positions, prefix, limit, seen, found):
+        """Acrescenta a found as posições cujo texto começa com prefix, até completar o limite."""
+        index = bisect_left(keys, prefix)
+        while index < len(keys) and len(found) < limit and keys[index].startswith(prefix):
+            position = positions[index]
+            if position not in seen:
+                seen.add(position)
+                found.append(position)
+            index += 1
+
+    def search(self, query, limit=10):
+        """Registros cujo texto (ou alguma palavra dele) começa com query, em ordem alfabética."""
+        prefix = normalize_text(query)
+        found = []
+        seen = set()
+        self._matches(self.full_keys, self.full_positions, prefix, limit, seen, found)
+        if prefix:
+            self._matches(self.word_keys, self.word_positions, prefix, limit, seen, found)
+        return [self.records[position] for position in found]
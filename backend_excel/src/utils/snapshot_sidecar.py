@@ -0,0 +1,85 @@
+"""
+Snapshot persistente dos dados já processados pelo cache.
+Guarda cada conjunto de dados (alunos, clientes, lojas, produtos) em um arquivo
+binário ao lado das planilhas, associado à impressão digital dos arquivos de origem.
+Na inicialização, conjuntos cujas planilhas não mudaram são lidos daqui em vez de reprocessados.
+"""
+
+import os
+import pickle
+import hashlib
+import tempfile
+
+# Incrementar sempre que o formato dos dados processados mudar
+SIDECAR_SCHEMA_VERSION = 4
+
+def file_fingerprint(filepath):
+    """Impressão digital do conteúdo de um arquivo (tamanho + hash BLAKE2)."""
+    if not os.path.exists(filepath):
+        return None
+
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return (os.path.getsize(filepath), digest.hexdigest())
+
+class SnapshotSidecar:
+    def __init__(self, path, schema_version=SIDECAR_SCHEMA_VERSION):
+        self.path = path
+        self.schema_version = schema_version
+        self.entries = None  # Carregado sob demanda
+
+    def _load(self):
+        """Lê o arquivo do snapshot; versões de esquema diferentes são descartadas."""
+        self.entries = {}
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                payload = pickle.load(f)
+        except Exception as e:
+            print(f"Snapshot persistente ignorado ({os.path.basename(self.path)}): {str(e)}")
+            return
+        if isinstance(payload, dict) and payload.get('schema_version') == self.schema_version:
+            self.entries = payload.get('datasets', {})
+
+    def get(self, name, fingerprints):
+        """Retorna o conjunto salvo se as impressões digitais das planilhas de origem coincidirem."""
+        if self.entries is None:
+            self._load()
+        entry = self.entries.get(name)
+        if entry is None or None in fingerprints.values() or entry['fingerprints'] != fingerprints:
+            return None
+        return entry['data']
+
+    def get_report(self, name):
+        """Retorna o relatório gerado junto com o conjunto salvo (ex.: produtos sem preço)."""
+        if self.entries is None:
+            self._load()
+        entry = self.entries.get(name)
+        return entry.get('report') if entry is not None else None
+
+    def put(self, name, fingerprints, data, report=None):
+        """Registra um conjunto processado (gravado em disco no próximo save)."""
+        if self.entries is None:
+            self._load()
+        self.entries[name] = {'fingerprints': fingerprints, 'data': data, 'report': report}
+
+    def save(self):
+        """Grava o snapshot com arquivo temporário + rename atômico."""
+        if self.entries is None:
+            return
+        dirpath = os.path.dirname(self.path)
+        fd, temp_path = tempfile.mkstemp(dir=dirpath, prefix=f'.{os.path.basename(self.path)}.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump({'schema_version': self.schema_version, 'datasets': self.entries}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Mesmo caminho de importação do src/main.py (pacote src a partir de backend_excel)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
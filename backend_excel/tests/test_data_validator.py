@@ -0,0 +1,58 @@
+"""
+Paridade entre a validação por colunas e a validação linha a linha (vectorized=False).
+As duas devem produzir os mesmos registros e os mesmos erros, na mesma ordem.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.data_validator import DataValidator, VALIDATION_SPECS
+
+FRAMES = {
+    'alunos': pd.DataFrame({
+        'Nome do Estudante': ['Ana Souza', '', None, '  Bia  Lima ', np.nan, 'Caio'],
+        'E-mail do Aluno': ['ana@escola.com', 'sem-arroba', 'x@y.com', '', 'bia@', np.nan],
+        'Série do Aluno': ['5º A', None, '6º B', '  7º  C ', '', 8],
+        'Número de Presença do Estudante': [1, 2.0, np.nan, '03', None, 'x'],
+        'Cep do Estudante': ['01310-100', '123', np.nan, '01310 100', 'abcdefgh', 1310100],
+        'Cidade do Estudante': ['São Paulo', '', None, 'Santos', np.nan, 'Campinas'],
+    }),
+    'clientes': pd.DataFrame({
+        'Nome': ['Carlos', '', 'Dora', None, 'Eva', 'Fábio'],
+        'Email': ['carlos@mail.com', 'ruim', np.nan, 'a@b.co', 'eva@mail', ''],
+        'CPF': ['123.456.789-09', '123', 12345678909, np.nan, '1234567890a', ''],
+        'Telefone': ['(11) 91234-5678', '12', np.nan, '1133334444', 'telefone', 11987654321],
+    }),
+    'produtos': pd.DataFrame({
+        'Nome': ['Caneta', 'Lápis', '', 'Caderno', None, 'Borracha', 'Régua'],
+        'Código': ['C1', 2, 'C3', np.nan, 'C5', 'C6', 'C7'],
+        'Peso': [0.1, None, '1kg', '', 3, 'x', np.nan],
+        'Preço': ['R$ 2,50', 'abc', 3.5, np.nan, '-1', -4.2, ''],
+    }),
+    'lojas': pd.DataFrame({
+        'Nome': ['Centro', '', 'Norte', None, 'Sul'],
+        'Endereço': ['Rua A, 1', None, '', 'Rua B', np.nan],
+        'Telefone': ['(11) 3333-4444', 'abc', np.nan, '123', ''],
+    }),
+}
+
+@pytest.mark.parametrize('data_type', sorted(FRAMES))
+def test_validacao_por_colunas_igual_a_linha_a_linha(data_type):
+    df = FRAMES[data_type]
+    validator = DataValidator()
+
+    # Chama a validação por colunas direto: validate_dataframe cairia na linha a linha se ela falhasse
+    por_colunas = validator._validate_dataframe_columns(df, VALIDATION_SPECS[data_type])
+    linha_a_linha = validator.validate_dataframe(df, data_type, vectorized=False)
+
+    assert por_colunas == linha_a_linha
+    # O exemplo precisa exercitar os erros (vazios, formatos inválidos, valores não numéricos)
+    assert linha_a_linha[1]
+
+def test_colunas_ausentes():
+    df = pd.DataFrame({'Nome': ['Caneta', '', 'Lápis']})
+    validator = DataValidator()
+
+    por_colunas = validator._validate_dataframe_columns(df, VALIDATION_SPECS['produtos'])
+    assert por_colunas == validator.validate_dataframe(df, 'produtos', vectorized=False)
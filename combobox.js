@@ -34,6 +34,8 @@ class ComboboxManager {
             allowCustomValue: true,
             onSelect: null,
             onInput: null,
+            remoteSearch: null, // (termo, limite) => Promise<Array>: sugestões vindas do servidor
+            remoteDelay: 150,   // Espera (ms) entre a digitação e a consulta ao servidor
             ...options
         };
 
@@ -104,6 +106,8 @@ class ComboboxInstance {
         this.filteredData = [...this.data];
         this.selectedIndex = -1;
         this.isOpen = false;
+        this.remoteTimer = null;
+        this.remoteRequest = 0; // Descarta respostas de consultas já superadas
         
         this.input = container.querySelector('.combobox-input');
         this.toggle = container.querySelector('.combobox-toggle');
@@ -161,7 +165,16 @@ class ComboboxInstance {
     }
 
     handleInput(value) {
+        if (this.config.remoteSearch) {
+            this.scheduleRemoteSearch(value);
+            return;
+        }
+
         this.filterData(value);
+        this.showResults(value);
+    }
+
+    showResults(value) {
         this.populateDropdown();
         this.openDropdown();
         this.selectedIndex = -1;
@@ -172,6 +185,34 @@ class ComboboxInstance {
         }
     }
 
+    /**
+     * Consulta as sugestões no servidor após uma pausa na digitação
+     * (em caso de erro, filtra os dados locais, se houver)
+     */
+    scheduleRemoteSearch(value) {
+        clearTimeout(this.remoteTimer);
+        this.remoteTimer = setTimeout(async () => {
+            const request = ++this.remoteRequest;
+            const term = value.trim().length >= this.config.minSearchLength ? value.trim() : '';
+            // Resposta que chega depois de outra consulta, da perda de foco ou de uma edição
+            // do campo (ex.: item já selecionado) é descartada: não reabre a lista
+            const stale = () => request !== this.remoteRequest
+                || document.activeElement !== this.input
+                || value !== this.input.value;
+            try {
+                const results = await this.config.remoteSearch(term, this.config.maxResults);
+                if (stale()) return;
+                this.filteredData = results || [];
+                this.data = this.filteredData;
+            } catch (error) {
+                if (stale()) return;
+                console.warn('Sugestões do servidor indisponíveis, filtrando localmente:', error);
+                this.filterData(value);
+            }
+            this.showResults(value);
+        }, this.config.remoteDelay);
+    }
+
     handleKeydown(e) {
         if (!this.isOpen && (e.key === 'ArrowDown' || e.key === 'ArrowUp')) {
             e.preventDefault();
@@ -324,6 +365,11 @@ class ComboboxInstance {
 
     openDropdown() {
         if (this.isOpen) return;
+
+        // Sem lista local: carrega as primeiras sugestões ao abrir
+        if (this.config.remoteSearch && this.data.length === 0) {
+            this.scheduleRemoteSearch(this.input.value);
+        }
         
         this.isOpen = true;
         this.dropdown.classList.add('show');
@@ -397,7 +443,7 @@ window.ComboboxUtils = {
     /**
      * Cria combobox para clientes
      */
-    createClienteCombobox(clientes) {
+    createClienteCombobox(clientes, options = {}) {
         return window.comboboxManager.create('clienteCombobox', clientes, {
             searchProperty: 'nome',
             displayProperty: 'nome',
@@ -407,25 +453,27 @@ window.ComboboxUtils = {
                 if (window.buscarEPreencherCliente) {
                     window.buscarEPreencherCliente(cliente.nome);
                 }
-            }
+            },
+            ...options
         });
     },
 
     /**
      * Cria combobox para lojas
      */
-    createLojaCombobox(lojas) {
+    createLojaCombobox(lojas, options = {}) {
         return window.comboboxManager.create('lojaCombobox', lojas, {
             searchProperty: 'nome',
             displayProperty: 'nome',
-            placeholder: 'Digite para pesquisar loja...'
+            placeholder: 'Digite para pesquisar loja...',
+            ...options
         });
     },
 
     /**
      * Cria combobox para produtos (usado em itens)
      */
-    createProdutoCombobox(container, produtos) {
+    createProdutoCombobox(container, produtos, options = {}) {
         const containerId = container.id || `produto-${Date.now()}`;
         container.id = containerId;
         
@@ -463,17 +511,15 @@ window.ComboboxUtils = {
                         }
                     }
                 }
-            }
+            },
+            ...options
         });
-    }
-};
-
-
+    },
 
     /**
      * Cria combobox para salas de aluno
      */
-    createSalaAlunoCombobox(salas) {
+    createSalaAlunoCombobox(salas, options = {}) {
         return window.comboboxManager.create("salaAlunoCombobox", salas, {
             searchProperty: "sala",
             displayProperty: "sala",
@@ -481,14 +527,15 @@ window.ComboboxUtils = {
             allowCustomValue: false,
             onSelect: (sala) => {
                 // Pode adicionar lógica de preenchimento automático aqui se necessário
-            }
+            },
+            ...options
         });
     },
 
     /**
      * Cria combobox para nomes de aluno
      */
-    createNomeAlunoCombobox(alunos) {
+    createNomeAlunoCombobox(alunos, options = {}) {
         return window.comboboxManager.create("nomeAlunoCombobox", alunos, {
             searchProperty: "nome",
             displayProperty: "nome",
@@ -499,8 +546,8 @@ window.ComboboxUtils = {
                 if (emailAlunoInput) {
                     emailAlunoInput.value = aluno.email || "";
                 }
-            }
+            },
+            ...options
         });
     }
-
-
+};
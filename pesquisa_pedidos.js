@@ -7,6 +7,10 @@ class PesquisaPedidos {
         this.itemsPerPage = 10;
         this.currentResults = [];
         this.currentFilters = {};
+        // Paginação no servidor: cursor de cada página já visitada e total da pesquisa
+        this.serverPaging = false;
+        this.pageCursors = [null];
+        this.totalResults = 0;
         
         this.init();
     }
@@ -145,30 +149,20 @@ class PesquisaPedidos {
         const filtros = this.getFilters();
         this.currentFilters = filtros;
         
+        this.currentPage = 1;
+        this.pageCursors = [null];
+        
         // Mostrar loading
         document.getElementById('loading').style.display = 'block';
         document.getElementById('search-results').style.display = 'block';
         
         try {
-            const queryParams = new URLSearchParams();
-            if (filtros.nomeAluno) queryParams.append('nome_aluno', filtros.nomeAluno);
-            if (filtros.idPedido) queryParams.append('id_pedido', filtros.idPedido);
-            if (filtros.dataInicio) queryParams.append('data_inicio', filtros.dataInicio);
-            if (filtros.dataFim) queryParams.append('data_fim', filtros.dataFim);
-            
-            const response = await fetch(`${this.apiBaseUrl}/pedidos/pesquisar?${queryParams}`);
-            
-            if (response.ok) {
-                const pedidos = await response.json();
-                this.currentResults = pedidos;
-                this.displayResults(pedidos);
-                this.showMessage(`${pedidos.length} pedidos encontrados.`, 'success');
-            } else {
-                throw new Error('Erro na pesquisa');
-            }
+            await this.carregarPagina();
+            this.showMessage(`${this.totalResults} pedidos encontrados.`, 'success');
         } catch (error) {
             console.log('Erro ao pesquisar pedidos:', error);
-            // Usar dados de exemplo se API não estiver disponível
+            // Usar dados de exemplo se API não estiver disponível (paginação local)
+            this.serverPaging = false;
             this.currentResults = this.getDadosExemplo(filtros);
             this.displayResults(this.currentResults);
             this.showMessage(`Usando dados de exemplo. ${this.currentResults.length} pedidos encontrados.`, 'info');
@@ -177,6 +171,39 @@ class PesquisaPedidos {
         }
     }
     
+    // Busca no servidor só a página atual (limit + cursor da página)
+    async carregarPagina() {
+        const queryParams = new URLSearchParams(this.filtrosParaApi(this.currentFilters));
+        queryParams.append('limit', this.itemsPerPage);
+        const cursor = this.pageCursors[this.currentPage - 1];
+        if (cursor) queryParams.append('cursor', cursor);
+        
+        const response = await fetch(`${this.apiBaseUrl}/pedidos/pesquisar?${queryParams}`);
+        if (!response.ok) {
+            throw new Error('Erro na pesquisa');
+        }
+        
+        const pedidos = await response.json();
+        const total = response.headers.get('X-Total-Count');
+        if (total !== null) {
+            this.totalResults = parseInt(total);
+        }
+        this.pageCursors[this.currentPage] = response.headers.get('X-Proximo-Cursor');
+        this.serverPaging = true;
+        this.currentResults = pedidos;
+        this.displayResults(pedidos);
+    }
+    
+    // Filtros do formulário -> parâmetros da API (pesquisa e exportação), só os preenchidos
+    filtrosParaApi(filtros) {
+        const parametros = {};
+        if (filtros.nomeAluno) parametros.nome_aluno = filtros.nomeAluno;
+        if (filtros.idPedido) parametros.id_pedido = filtros.idPedido;
+        if (filtros.dataInicio) parametros.data_inicio = filtros.dataInicio;
+        if (filtros.dataFim) parametros.data_fim = filtros.dataFim;
+        return parametros;
+    }
+    
     getFilters() {
         return {
             nomeAluno: document.getElementById('filtro-nome-aluno').value.trim(),
@@ -267,8 +294,8 @@ class PesquisaPedidos {
             return;
         }
         
-        // Paginação
-        const startIndex = (this.currentPage - 1) * this.itemsPerPage;
+        // Paginação (no servidor a lista já é a página atual)
+        const startIndex = this.serverPaging ? 0 : (this.currentPage - 1) * this.itemsPerPage;
         const endIndex = startIndex + this.itemsPerPage;
         const paginatedResults = pedidos.slice(startIndex, endIndex);
         
@@ -278,8 +305,9 @@ class PesquisaPedidos {
         });
         
         // Atualizar contador e paginação
-        document.getElementById('results-count').textContent = `${pedidos.length} pedidos encontrados`;
-        this.updatePagination(pedidos.length);
+        const totalItems = this.serverPaging ? this.totalResults : pedidos.length;
+        document.getElementById('results-count').textContent = `${totalItems} pedidos encontrados`;
+        this.updatePagination(totalItems);
     }
     
     createResultRow(pedido) {
@@ -404,8 +432,8 @@ class PesquisaPedidos {
                                 <li class="item-pedido">
                                     <span class="item-nome">${item.produto}</span>
                                     <span class="item-quantidade">Qtd: ${item.quantidade}</span>
-                                    <span class="item-preco">Unit: ${this.formatCurrency(item.preco)}</span>
-                                    <span class="item-total">Total: ${this.formatCurrency(item.total)}</span>
+                                    <span class="item-preco">Unit: ${this.formatCurrency(item.preco_unitario ?? item.preco)}</span>
+                                    <span class="item-total">Total: ${this.formatCurrency(item.valor_total ?? item.total)}</span>
                                 </li>
                             `).join('') : 
                             '<li style="text-align: center; color: #6b7280;">Nenhum item detalhado disponível</li>'
@@ -447,21 +475,37 @@ class PesquisaPedidos {
         const btnNext = document.getElementById('btn-next-page');
         
         btnPrev.disabled = this.currentPage === 1;
-        btnNext.disabled = this.currentPage === totalPages;
+        btnNext.disabled = this.serverPaging ? !this.pageCursors[this.currentPage] : this.currentPage === totalPages;
+    }
+    
+    async irParaPagina(pagina) {
+        const anterior = this.currentPage;
+        this.currentPage = pagina;
+        if (!this.serverPaging) {
+            this.displayResults(this.currentResults);
+            return;
+        }
+        try {
+            await this.carregarPagina();
+        } catch (error) {
+            console.log('Erro ao carregar página:', error);
+            this.currentPage = anterior;
+            this.showMessage('Erro ao carregar a página. Refaça a pesquisa.', 'error');
+        }
     }
     
     previousPage() {
         if (this.currentPage > 1) {
-            this.currentPage--;
-            this.displayResults(this.currentResults);
+            this.irParaPagina(this.currentPage - 1);
         }
     }
     
     nextPage() {
-        const totalPages = Math.ceil(this.currentResults.length / this.itemsPerPage);
-        if (this.currentPage < totalPages) {
-            this.currentPage++;
-            this.displayResults(this.currentResults);
+        const temProxima = this.serverPaging
+            ? Boolean(this.pageCursors[this.currentPage])
+            : this.currentPage < Math.ceil(this.currentResults.length / this.itemsPerPage);
+        if (temProxima) {
+            this.irParaPagina(this.currentPage + 1);
         }
     }
     
@@ -477,15 +521,29 @@ class PesquisaPedidos {
                 headers: {
                     'Content-Type': 'application/json'
                 },
-                body: JSON.stringify(this.currentFilters)
+                body: JSON.stringify(this.filtrosParaApi(this.currentFilters))
             });
             
-            if (response.ok) {
-                const result = await response.json();
-                this.showMessage(`${result.message}`, 'success');
-            } else {
+            if (response.status === 404) {
+                this.showMessage('Nenhum pedido encontrado para exportar.', 'error');
+                return;
+            }
+            if (!response.ok) {
                 throw new Error('Erro na exportação');
             }
+            
+            // A planilha fica no servidor por um tempo; baixar pelo link devolvido
+            const result = await response.json();
+            const downloadUrl = new URL(result.download_url, this.apiBaseUrl).href;
+            const link = document.createElement('a');
+            link.setAttribute('href', downloadUrl);
+            link.setAttribute('download', result.filename);
+            link.style.visibility = 'hidden';
+            document.body.appendChild(link);
+            link.click();
+            document.body.removeChild(link);
+            
+            this.showMessage(`${result.message}`, 'success');
         } catch (error) {
             console.log('Erro ao exportar:', error);
             // Fallback: criar CSV simples
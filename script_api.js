@@ -158,6 +158,11 @@ const dataLoader = {
         }
     },
 
+    async sugerir(dataset, termo, limite = 10) {
+        // Sem tratamento de erro aqui: o combobox filtra os dados locais se o servidor falhar
+        return apiUtils.get(`/${dataset}/sugerir?q=${encodeURIComponent(termo)}&limit=${limite}`);
+    },
+
     async salvarPedido(dadosPedido) {
         try {
             return await apiUtils.post('/pedidos', dadosPedido);
@@ -279,50 +284,32 @@ async function initializeForm() {
     try {
         messageSystem.info('Carregando dados...');
         
-        // Tentar carregar dados da API com timeout curto
+        // Verificar a API com timeout curto: com ela disponível, os comboboxes consultam
+        // as sugestões no servidor enquanto o usuário digita, sem baixar as listas completas
         const timeout = 3000; // 3 segundos
-        const promises = [
-            Promise.race([
-                dataLoader.loadAlunos(),
-                new Promise((_, reject) => setTimeout(() => reject(new Error('Timeout')), timeout))
-            ]),
-            Promise.race([
-                dataLoader.loadClientes(),
-                new Promise((_, reject) => setTimeout(() => reject(new Error('Timeout')), timeout))
-            ]),
-            Promise.race([
-                dataLoader.loadLojas(),
-                new Promise((_, reject) => setTimeout(() => reject(new Error('Timeout')), timeout))
-            ]),
-            Promise.race([
-                dataLoader.loadProdutos(),
-                new Promise((_, reject) => setTimeout(() => reject(new Error('Timeout')), timeout))
-            ])
-        ];
-
-        let alunos, clientes, lojas, produtos;
-        
         try {
-            [alunos, clientes, lojas, produtos] = await Promise.all(promises);
-            messageSystem.success('Dados carregados da API com sucesso!');
+            await Promise.race([
+                apiUtils.get('/ping'),
+                new Promise((_, reject) => setTimeout(() => reject(new Error('Timeout')), timeout))
+            ]);
+            window.sugestoesRemotas = true;
+            messageSystem.success('Conectado à API com sucesso!');
+
+            populateAlunosDropdown([]);
+            populateClientesDropdown([]);
+            populateLojaDropdown([]);
+            window.produtosDisponiveis = [];
         } catch (error) {
             console.warn('API não disponível, usando dados de exemplo:', error);
             messageSystem.warning('API não disponível. Usando dados de exemplo.');
-            
+            window.sugestoesRemotas = false;
+
             // Usar dados de fallback
-            alunos = dataLoader.getFallbackAlunos();
-            clientes = dataLoader.getFallbackClientes();
-            lojas = dataLoader.getFallbackLojas();
-            produtos = dataLoader.getFallbackProdutos();
+            populateAlunosDropdown(dataLoader.getFallbackAlunos());
+            populateClientesDropdown(dataLoader.getFallbackClientes());
+            populateLojaDropdown(dataLoader.getFallbackLojas());
+            window.produtosDisponiveis = dataLoader.getFallbackProdutos();
         }
-
-        // Popular dropdowns
-        populateAlunosDropdown(alunos);
-        populateClientesDropdown(clientes);
-        populateLojaDropdown(lojas);
-        
-        // Armazenar produtos para uso posterior
-        window.produtosDisponiveis = produtos;
         
         // Configurar event listeners
         setupEventListeners();
@@ -332,6 +319,7 @@ async function initializeForm() {
         messageSystem.error('Erro ao inicializar formulário.');
         
         // Usar dados de fallback como último recurso
+        window.sugestoesRemotas = false;
         populateAlunosDropdown(dataLoader.getFallbackAlunos());
         populateClientesDropdown(dataLoader.getFallbackClientes());
         populateLojaDropdown(dataLoader.getFallbackLojas());
@@ -341,34 +329,40 @@ async function initializeForm() {
     }
 }
 
+// Opções de combobox para buscar as sugestões de um conjunto de dados no servidor
+function sugestoesDoServidor(dataset) {
+    if (!window.sugestoesRemotas) return {};
+    return { remoteSearch: (termo, limite) => dataLoader.sugerir(dataset, termo, limite) };
+}
+
 // Popular combobox de alunos
 function populateAlunosDropdown(alunos) {
     // Extrair salas únicas
     const salasUnicas = [...new Set(alunos.map(aluno => aluno.sala))].map(sala => ({ sala: sala }));
     
     // Usar o novo sistema de combobox para sala do aluno
-    window.ComboboxUtils.createSalaAlunoCombobox(salasUnicas);
+    window.ComboboxUtils.createSalaAlunoCombobox(salasUnicas, sugestoesDoServidor('salas'));
 
     // Usar o novo sistema de combobox para nome do aluno
-    window.ComboboxUtils.createNomeAlunoCombobox(alunos);
+    window.ComboboxUtils.createNomeAlunoCombobox(alunos, sugestoesDoServidor('alunos'));
 }
 
 // Popular combobox de clientes
 function populateClientesDropdown(clientes) {
     // Usar o novo sistema de combobox
-    window.ComboboxUtils.createClienteCombobox(clientes);
+    window.ComboboxUtils.createClienteCombobox(clientes, sugestoesDoServidor('clientes'));
 }
 
 // Popular combobox de lojas
 function populateLojaDropdown(lojas) {
     // Usar o novo sistema de combobox
-    window.ComboboxUtils.createLojaCombobox(lojas);
+    window.ComboboxUtils.createLojaCombobox(lojas, sugestoesDoServidor('lojas'));
 }
 
 // Popular combobox de produtos em um item
 function populateProdutoDropdown(container, produtos) {
     // Usar o novo sistema de combobox
-    window.ComboboxUtils.createProdutoCombobox(container, produtos);
+    window.ComboboxUtils.createProdutoCombobox(container, produtos, sugestoesDoServidor('produtos'));
 }
 
 // Configurar event listeners
@@ -697,7 +691,12 @@ async function enviarPedido(e) {
         // Tentar salvar via API
         try {
             const resultado = await dataLoader.salvarPedido(dadosPedido);
-            messageSystem.success('Pedido enviado com sucesso!');
+            if (resultado && resultado.status === 'pendente') {
+                // Gravação ainda em andamento no servidor: não reenviar (geraria um pedido duplicado)
+                messageSystem.info(`Pedido ${resultado.id_pedido} recebido e em gravação.`);
+            } else {
+                messageSystem.success('Pedido enviado com sucesso!');
+            }
             
             // Limpar formulário após sucesso
             setTimeout(() => {